@@ -8,10 +8,10 @@ OPIc Exam Page (feature/opic-questions 우선)
 
 import os
 import sys
-import random
 import asyncio
 import base64
-from typing import List, Dict
+import uuid
+from typing import List
 
 # --- 프로젝트 루트 경로 추가 (필요 시) ---
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
@@ -21,45 +21,17 @@ if project_root not in sys.path:
 import streamlit as st
 
 # 내부 모듈
-from quest import make_questions
+from quest import (make_exam_questions_async, make_async_openai_client, question_bank,
+                   SELF_INTRO_QUESTION, plan_exam_sections)
 from OPIc_Buddy.app.components.survey import get_survey_data, get_user_profile, KO_EN_MAPPING  # ← 오타/중복 주석 제거
-from app.utils.voice_utils import VoiceManager, unified_answer_input  # 음성 유틸
+from app.utils.voice_utils import (VoiceManager, unified_answer_input, get_tts_prefetcher,  # 음성 유틸
+                                   resolve_pending_transcriptions)
+from exam_pack import draw_exam_from_pack  # 사전 생성 시험 팩
+from app.utils.openai_api.grading_worker import submit_for_grading  # 시험 중 백그라운드 채점
 
 # ========================
 # Helper Functions
 # ========================
-def get_survey_topics_from_data() -> Dict[str, List[str]]:
-    """
-    Extracts all possible survey topics to be used for the exam.
-    (feature/opic-questions 분기에서 쓰던 기본 구조 유지)
-    """
-    topic_structure = {
-        "survey": [
-            "have work experience", "living alone in a house/apartment", "living with friends in a house/apartment",
-            "living with family in a house/apartment", "dormitory", "military barracks", "student",
-            "museum", "watching sports", "TV", "watching cooking programs", "driving", "club", "park",
-            "Improving living space", "texting friends", "watching reality shows", "spa/massage shop",
-            "camping", "performance", "bar/pub", "billiard", "test preparation", "news", "shopping",
-            "beach", "volunteering", "chess", "cafe", "SNS", "movies", "game", "concert", "health",
-            "searching job", "reading books to children", "music", "musical instruments", "dancing",
-            "writing", "drawing", "cooking", "pets", "reading", "investing", "travel magazine", "singing",
-            "basketball", "baseball/softball", "soccer", "american football", "hockey", "cricket",
-            "golf", "volleyball", "tennis", "badminton", "table tennis", "swimming", "bicycling",
-            "skiing/snowboarding", "ice skating", "jogging", "walking", "yoga", "hiking/trekking",
-            "fishing", "taekwondo", "taking fitness classes", "do not exercise",
-            "domestic business trip", "overseas business trip", "staycation", "domestic travel",
-            "international travel", "newspaper", "taking photos"
-        ],
-        "role_play": [
-            "Getting Ready for Traveling", "Cancelling Appointment", "Item Purchase"
-        ],
-        "random_question": [
-            "technology", "industry", "recycling", "weather"
-        ]
-    }
-    return topic_structure
-
-
 def get_mapped_survey_topics() -> List[str]:
     """
     Gets the user's selected survey topics from survey.py's session state
@@ -99,33 +71,27 @@ async def create_opic_exam() -> List[str]:
     user_level = survey_data.get("self_assessment", "level_5")
 
     # 1. Self-introduction
-    exam_questions.append("Tell me about yourself.")
+    exam_questions.append(SELF_INTRO_QUESTION)
 
-    # 2-10. Survey topics (3 topics x 3 questions)
+    # 미리 만들어 둔 시험 팩(OPIC_EXAM_PACK)에 설문과 맞는 시험이 있으면 즉시 사용
     user_survey_topics = get_mapped_survey_topics()
-    unique_topics = list({t for t in user_survey_topics if t})
+    packed = draw_exam_from_pack(user_survey_topics)
+    if packed:
+        return packed
 
-    if len(unique_topics) >= 3:
-        topics_for_exam = random.sample(unique_topics, 3)
-    else:
-        all_survey_topics = get_survey_topics_from_data()["survey"]
-        topics_for_exam = random.sample(all_survey_topics, 3)
+    # 2-15. 섹션 구성: (topic, category, 문항 수)
+    sections = plan_exam_sections(user_survey_topics)
 
-    for topic in topics_for_exam:
-        questions = make_questions(topic, 'survey', user_level, 3)
-        exam_questions.extend(questions)
+    # 모든 섹션의 예시 질문을 한 번에 조회 (DB 왕복 최대 1회)
+    contexts = question_bank.get_many([(category, topic) for topic, category, _ in sections])
 
-    # 11-13. Role-play (3 questions)
-    role_play_topics = get_survey_topics_from_data()["role_play"]
-    role_play_topic = random.choice(role_play_topics)
-    role_play_questions = make_questions(role_play_topic, 'role_play', user_level, 3)
-    exam_questions.extend(role_play_questions)
+    # 워밍 풀/캐시에 없는 섹션만 한 번의 배치 요청으로 생성
+    async with make_async_openai_client() as client:
+        results = await make_exam_questions_async(sections, user_level, contexts, client=client)
 
-    # 14-15. Random (2 questions)
-    random_question_topics = get_survey_topics_from_data()["random_question"]
-    random_topic = random.choice(random_question_topics)
-    random_questions = make_questions(random_topic, 'random_question', user_level, 2)
-    exam_questions.extend(random_questions)
+    # 섹션 순서대로 이어 붙임
+    for questions in results:
+        exam_questions.extend(questions)
 
     return exam_questions
 
@@ -154,6 +120,17 @@ def _gif_to_base64_html(gif_path: str, width: int | None = None) -> str:
 # ========================
 # Streamlit Page
 # ========================
+def _submit_answer_for_grading(pos: int) -> None:
+    """exam_answers[pos]를 피드백 페이지와 같은 (질문, 답변, 설문) 조합으로 사전 채점 요청."""
+    questions = st.session_state.get("exam_questions", [])
+    answers = st.session_state.get("exam_answers", [])
+    if pos < len(questions) and pos < len(answers):
+        session_id = st.session_state.setdefault("grading_session", uuid.uuid4().hex)
+        job = submit_for_grading(session_id, questions[pos], answers[pos], st.session_state.get("survey_data", {}))
+        if job is not None:
+            st.session_state.setdefault("grading_jobs", []).append(job)
+
+
 def show_exam():
     # 세션 준비
     if "exam_questions" not in st.session_state or not st.session_state["exam_questions"]:
@@ -161,12 +138,20 @@ def show_exam():
         with st.spinner("문제를 생성하는 중..."):
             qs = asyncio.run(get_final_questions_for_streamlit())
         st.session_state["exam_questions"] = qs
+    # 시험이 준비되면 바로 전 문항 TTS 미리 합성 시작
+    get_tts_prefetcher(st.session_state["exam_questions"])
 
     if "exam_answers" not in st.session_state or not isinstance(st.session_state["exam_answers"], list):
         st.session_state["exam_answers"] = []
     if "exam_idx" not in st.session_state:
         st.session_state["exam_idx"] = 0
 
+    # 이전 문항에서 진행 중이던 전사가 끝났으면 답변 반영 (+ 백그라운드 채점에 넘김)
+    pending_before = set(st.session_state.get("pending_stt", {}))
+    resolve_pending_transcriptions()
+    for pos in pending_before - set(st.session_state.get("pending_stt", {})):
+        _submit_answer_for_grading(pos)
+
     questions = st.session_state["exam_questions"]
     exam_idx = st.session_state["exam_idx"]
 
@@ -198,9 +183,10 @@ def show_exam():
                 unsafe_allow_html=True
             )
         # 오디오 플레이어는 항상 표시
-        voice_manager = VoiceManager()
-        # 자동재생용 play_question_audio는 제거, 오디오 데이터만 생성해서 플레이어 한 번만 표시
-        audio_data = voice_manager.text_to_speech(current_question)
+        # 미리 합성된 오디오를 우선 사용하고, 실패했을 때만 동기 합성
+        audio_data = get_tts_prefetcher(questions).get(exam_idx)
+        if audio_data is None:
+            audio_data = VoiceManager().text_to_speech(current_question)
         if audio_data:
             st.audio(audio_data, format='audio/mp3')
     # 피드백 메시지 제거 (불필요)
@@ -235,7 +221,15 @@ def show_exam():
         if st.button("→ Next", key=f"next_btn_{exam_idx}"):
             # 답변이 있으면 그대로, 없으면 '답변 없음'으로 기록
             recorded_answer = answer.strip() if answer and answer.strip() else "답변 없음"
+            # 음성 전사가 아직 진행 중이면 끝나는 대로 이 자리에 채우도록 등록
+            stt_job = st.session_state.get(f"stt_job_{exam_idx}")
+            pos = len(st.session_state.exam_answers)
+            if stt_job and not (answer and answer.strip()):
+                st.session_state.setdefault("pending_stt", {})[pos] = stt_job
             st.session_state.exam_answers.append(recorded_answer)
+            # 전사 대기 중이 아니면 바로 백그라운드 채점 큐에 넣음 (피드백 페이지에서는 남은 것만 채점)
+            if pos not in st.session_state.get("pending_stt", {}):
+                _submit_answer_for_grading(pos)
             st.session_state.user_input = ""
             st.session_state.exam_idx += 1
             st.rerun()
@@ -1,5 +1,4 @@
 # app/components/feedback.py
-import time
 from pathlib import Path
 import streamlit as st
 
@@ -14,6 +13,10 @@ class OPICFeedbackService:
     def run(self, questions, answers, survey_data):
         return self.tutor.get_comprehensive_feedback(questions, answers, survey_data)
 
+    def stream(self, questions, answers, survey_data):
+        # ("item", 문항 피드백) ... ("summary", 종합 결과) 순으로 배치가 끝나는 대로 전달
+        return self.tutor.iter_comprehensive_feedback(questions, answers, survey_data)
+
 # ===== [4] 텍스트 하이라이트 유틸 =====
 import difflib, re
 def _classify_change_type(original_part, improved_part):
@@ -69,7 +72,7 @@ def highlight_text_differences(original_text, improved_text):
 
 # ===== [2] 피드백 UI 패널 =====
 try:
-    from app.utils.voice_utils import VoiceManager
+    from app.utils.voice_utils import VoiceManager, resolve_pending_transcriptions, play_audio_stream
     VOICE_AVAILABLE = True
 except ImportError:
     VOICE_AVAILABLE = False
@@ -77,6 +80,11 @@ except ImportError:
 def show_feedback_page():
     st.title("OPIc Buddy — 종합 피드백")
 
+    # 시험 중 백그라운드로 돌던 음성 전사가 남아 있으면 마저 기다려 답변에 반영
+    if VOICE_AVAILABLE and st.session_state.get("pending_stt"):
+        with st.spinner("🔄 남은 음성 답변을 텍스트로 변환 중..."):
+            resolve_pending_transcriptions(wait=60)
+
     questions = st.session_state.get("exam_questions", [])
     answers   = st.session_state.get("exam_answers", [])
     if not questions or not answers:
@@ -98,9 +106,8 @@ def show_feedback_page():
                         "</div>", unsafe_allow_html=True)
  
     if st.button("📊 OPIc 레벨 분석 & 피드백 받기", type="primary"):
-        _generate_feedback()
-
-    if "comprehensive_feedback" in st.session_state:
+        _generate_feedback()  # 채점되는 대로 바로 화면에 그림
+    elif "comprehensive_feedback" in st.session_state:
         _display_feedback()
 
     # 하단에 다시하기 버튼 추가
@@ -117,119 +124,160 @@ def show_feedback_page():
             st.session_state.exam_idx = 0
             st.session_state.exam_answers = []
             st.session_state.exam_questions = []
+            st.session_state.pop("grading_jobs", None)
             st.rerun()
 
 def _generate_feedback():
+    questions = st.session_state.exam_questions
+    answers   = st.session_state.exam_answers
+    survey    = st.session_state.get("survey_data", {})
+
+    progress_bar = st.progress(0)
+    status = st.empty()
+    status.text("OPIc 레벨 평가 중... (채점이 끝난 문항부터 바로 표시됩니다)")
+
+    def _with_progress(stream):
+        # 시험 중 백그라운드로 돌던 사전 채점을 마무리 (끝난 문항은 캐시에서 바로 나옴)
+        # — 제너레이터 안에서 기다리므로 그동안 예비 점수가 먼저 표시된다
+        from app.utils.openai_api.grading_worker import wait_for_background_grading
+        wait_for_background_grading(st.session_state.get("grading_session"),
+                                    st.session_state.pop("grading_jobs", []))
+        done, total = 0, max(1, len(questions))
+        for kind, payload in stream:
+            if kind == "item":
+                done += 1
+                progress_bar.progress(min(done / total, 1.0))
+                status.text(f"문항별 채점 중... ({done}/{total})")
+            yield kind, payload
+
     try:
-        progress_bar = st.progress(0)
-        status = st.empty()
-        with st.spinner("🔍 분석 중..."):
-            status.text("답변 로딩...")
-            progress_bar.progress(25)
-
-            questions = st.session_state.exam_questions
-            answers   = st.session_state.exam_answers
-            survey    = st.session_state.get("survey_data", {})
-
-            svc = OPICFeedbackService()
-            status.text("OPIc 레벨 평가 중...")
-            progress_bar.progress(60)
-            fb = svc.run(questions, answers, survey)
-
-            status.text("피드백 정리 중...")
-            progress_bar.progress(90)
-            st.session_state.comprehensive_feedback = fb
-
-            progress_bar.progress(100)
-            time.sleep(0.3)
-        status.empty()
+        st.session_state.pop("comprehensive_feedback", None)
+        svc = OPICFeedbackService()
+        _display_feedback(stream=_with_progress(svc.stream(questions, answers, survey)))
         progress_bar.empty()
-        st.success("🎊 분석 완료!")
+        status.success("🎊 분석 완료!")
     except Exception as e:
+        progress_bar.empty()
+        status.empty()
         st.error(f"❌ 피드백 생성 오류: {e}")
 
-def _display_feedback():
-    fb = st.session_state.get("comprehensive_feedback", {})
-    if not fb:
-        st.warning("피드백 데이터가 없습니다.")
+def _render_feedback_item(item, qs, ans, answer_audio_files):
+    qn = item.get("question_num", 0)
+    i = qn - 1
+    if i < 0 or i >= len(qs):
         return
+    with st.expander(f"Q{qn} - 점수: {item.get('score',0)}/100", expanded=False):
+        st.markdown("### 📋 질문")
+        st.info(qs[i])
 
-    st.markdown("---")
+        st.markdown("### 📝 내 답변")
+        user_answer = ans[i] if i < len(ans) else ""
+        st.write(f'"{user_answer}"' if user_answer else "_(답변 없음)_")
+        # 내 답변 오디오 듣기 버튼 (항상 표시, 파일이 있으면 재생)
+        audio_file = answer_audio_files[i] if i < len(answer_audio_files) else None
+        if st.button("🎤 내 답변 듣기", key=f"play_my_{qn}"):
+            if audio_file:
+                st.audio(audio_file, format="audio/mp3")
+            else:
+                st.warning("녹음된 음성 파일이 없습니다.")
+
+        st.markdown("### 💭 피드백")
+        c1, c2 = st.columns(2)
+        with c1:
+            st.subheader("💪 잘한 점")
+            for s in item.get("strengths", []):
+                st.write(f"• {s}")
+        with c2:
+            st.subheader("🎯 개선점")
+            for g in item.get("improvements", []):
+                st.write(f"→ {g}")
+
+        sample = item.get("sample_answer","")
+        if sample:
+            st.markdown("### ✨ 개선된 모범답안")
+            st.markdown(
+                '<span style="font-size:0.98em;">'
+                ' <span style="color:#d32f2f;font-weight:600;">빨간색</span>: 문법 수정 '
+                ' <span style="color:#1976d2;font-weight:600;">파란색</span>: 내용 추가/개선'
+                '</span>', unsafe_allow_html=True)
+            html = highlight_text_differences(user_answer, sample)
+            st.markdown(
+                '<div style="background-color:#f8f9fa;padding:16px;border-radius:8px;'
+                'border-left:4px solid #0d6efd;margin:10px 0;">'
+                f'<div style="font-style:italic;line-height:1.8;color:#495057;font-size:1.05em;">"{html}"</div>'
+                '</div>',
+                unsafe_allow_html=True
+            )
+            if VOICE_AVAILABLE and st.button("🎧 모범답안 듣기", key=f"play_sample_{qn}"):
+                try:
+                    # 첫 문장이 합성되는 즉시 재생을 시작하고, 나머지 조각은 도착하는 대로 같은 플레이어에 이어 붙임
+                    play_audio_stream(VoiceManager().stream_text_to_speech(sample.strip()))
+                except Exception as e:
+                    st.error(f"TTS 오류: {e}")
+
+def _render_score_header(fb, provisional=False):
     col1, col2 = st.columns(2)
+    suffix = " (예상)" if provisional else ""
     col1.metric(
-        "📊 총점",
+        "📊 총점" + suffix,
         f"{fb.get('overall_score',0)}/100",
         help="OPIc Buddy의 0~100점 환산 기준에 따라 산출된 전체 평균 점수입니다. 각 문항별 점수를 평균내어 계산합니다."
     )
     col2.metric(
-        "🎯 OPIc 레벨",
+        "🎯 OPIc 레벨" + suffix,
         fb.get("opic_level","-"),
         help="OPIc Buddy의 9단계 등급 체계(AL, IH, IM3, IM2, IM1, IL, NH, NM, NL) 중 본인의 답변 평균 점수에 따라 자동 산정된 레벨입니다."
     )
-    if fb.get("level_description"):
+    if provisional:
+        st.caption("⏱️ 답변 길이·어휘·전환어 등으로 계산한 예비 결과입니다. AI 채점이 끝나면 바뀝니다.")
+    elif fb.get("level_description"):
         st.info(f"💡 {fb['level_description']}")
 
+def _display_feedback(stream=None):
+    """
+    stream이 없으면 session_state의 완성된 피드백을 그린다.
+    stream(("item", ...)/("summary", ...))이 주어지면 문항 자리를 먼저 잡아 두고
+    채점이 끝나는 대로 채운 뒤, 종합 결과를 session_state에 저장한다.
+    """
+    fb = st.session_state.get("comprehensive_feedback", {})
+    if stream is None and not fb:
+        st.warning("피드백 데이터가 없습니다.")
+        return
+
+    st.markdown("---")
+    header = st.empty()  # 총점/레벨: 스트리밍 중에는 예비 점수, 종합 결과가 나오면 교체
+
     # (상단 질문/답변 요약은 show_feedback_page에서 항상 카드로 보여주므로 여기선 제거)
     st.markdown("## 📝 문항별 상세 피드백")
-    indiv = fb.get("individual_feedback", [])
     qs = st.session_state.exam_questions
     ans = st.session_state.exam_answers
 
     answer_audio_files = st.session_state.get("answer_audio_files", [None]*len(ans))
-    for item in indiv:
-        qn = item.get("question_num", 0)
-        i = qn - 1
-        if i < 0 or i >= len(qs):
-            continue
-        with st.expander(f"Q{qn} - 점수: {item.get('score',0)}/100", expanded=False):
-            st.markdown("### 📋 질문")
-            st.info(qs[i])
-
-            st.markdown("### 📝 내 답변")
-            user_answer = ans[i] if i < len(ans) else ""
-            st.write(f'"{user_answer}"' if user_answer else "_(답변 없음)_")
-            # 내 답변 오디오 듣기 버튼 (항상 표시, 파일이 있으면 재생)
-            audio_file = answer_audio_files[i] if i < len(answer_audio_files) else None
-            if st.button("🎤 내 답변 듣기", key=f"play_my_{qn}"):
-                if audio_file:
-                    st.audio(audio_file, format="audio/mp3")
-                else:
-                    st.warning("녹음된 음성 파일이 없습니다.")
-
-            st.markdown("### 💭 피드백")
-            c1, c2 = st.columns(2)
-            with c1:
-                st.subheader("💪 잘한 점")
-                for s in item.get("strengths", []):
-                    st.write(f"• {s}")
-            with c2:
-                st.subheader("🎯 개선점")
-                for g in item.get("improvements", []):
-                    st.write(f"→ {g}")
-
-            sample = item.get("sample_answer","")
-            if sample:
-                st.markdown("### ✨ 개선된 모범답안")
-                st.markdown(
-                    '<span style="font-size:0.98em;">'
-                    ' <span style="color:#d32f2f;font-weight:600;">빨간색</span>: 문법 수정 '
-                    ' <span style="color:#1976d2;font-weight:600;">파란색</span>: 내용 추가/개선'
-                    '</span>', unsafe_allow_html=True)
-                html = highlight_text_differences(user_answer, sample)
-                st.markdown(
-                    '<div style="background-color:#f8f9fa;padding:16px;border-radius:8px;'
-                    'border-left:4px solid #0d6efd;margin:10px 0;">'
-                    f'<div style="font-style:italic;line-height:1.8;color:#495057;font-size:1.05em;">"{html}"</div>'
-                    '</div>',
-                    unsafe_allow_html=True
-                )
-                if VOICE_AVAILABLE and st.button("🎧 모범답안 듣기", key=f"play_sample_{qn}"):
-                    try:
-                        audio_bytes = VoiceManager().text_to_speech(sample.strip())
-                        if audio_bytes:
-                            st.audio(audio_bytes)
-                    except Exception as e:
-                        st.error(f"TTS 오류: {e}")
+    if stream is None:
+        for item in fb.get("individual_feedback", []):
+            _render_feedback_item(item, qs, ans, answer_audio_files)
+    else:
+        # LLM 채점이 끝나기 전까지 로컬 휴리스틱 예비 점수를 먼저 보여줌
+        from app.utils.heuristic_scorer import provisional_feedback
+        provisional = provisional_feedback([(ans[i] if i < len(ans) else "") for i in range(len(qs))])
+        with header.container():
+            _render_score_header(provisional, provisional=True)
+        slots = {qn: st.empty() for qn in range(1, len(qs) + 1)}
+        for item in provisional["individual_feedback"]:
+            slot = slots[item["question_num"]]
+            slot.caption(f"Q{item['question_num']} - ⏳ 채점 중... (예상 점수 {item['score']}/100)")
+        for kind, payload in stream:
+            if kind == "item":
+                slot = slots.get(payload.get("question_num"))
+                if slot is not None:
+                    with slot.container():
+                        _render_feedback_item(payload, qs, ans, answer_audio_files)
+            else:
+                fb = payload
+                st.session_state.comprehensive_feedback = fb
+
+    with header.container():
+        _render_score_header(fb)
 
     st.markdown("## 🎯 종합 평가")
     for title, key in [("🌟 전체 강점","overall_strengths"), ("📈 우선 개선사항","priority_improvements")]:
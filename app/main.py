@@ -4,6 +4,7 @@ import asyncio
 from components.intro import show_intro
 from components.survey import show_survey
 from components import exam as exam_mod # <--- Corrected import statement
+from app.utils.voice_utils import render_voice_metrics  # exam 임포트가 프로젝트 루트를 sys.path에 추가
 
 def initialize_session_state():
     """Initializes session state variables with default values."""
@@ -28,6 +29,7 @@ def main():
     favicon_path = os.path.join(os.path.dirname(__file__), "opic buddy.png")
     st.set_page_config(page_title="OPIc Buddy", page_icon=favicon_path, layout="centered")
     initialize_session_state()
+    render_voice_metrics()
 
     stage = st.session_state.get("stage", "intro")
 
@@ -0,0 +1,132 @@
+# 로컬 휴리스틱 예비 채점기
+"""
+LLM 채점을 기다리는 동안(또는 API가 느리거나 죽었을 때) 쓰는 빠른 로컬 채점.
+전체 답변을 한 번에 특징 행렬로 만들고 NumPy로 점수를 계산한다.
+- 단어 수, 어휘 다양도(TTR), 문장 길이 변동(CV), 전환어 사용, 한글 혼입 비율, 군말(filler) 비율
+- 점수는 0~100, 레벨은 튜터와 같은 9단계(score_to_level)
+- 답변이 있으면 튜터와 같은 길이별 하한(min_score_by_length)을 적용 (무응답만 0점)
+"""
+import re
+from typing import Dict, List
+
+import numpy as np
+
+from app.utils.opic_levels import HANGUL_RE, min_score_by_length, score_to_level
+
+# 채점 프롬프트/학습 추천에서 요구하는 전환어
+TRANSITIONS = (
+    "however", "for example", "additionally", "as a result", "although",
+    "meanwhile", "on top of that", "moreover", "furthermore", "therefore",
+    "for instance", "in addition", "after that", "finally", "because",
+)
+FILLERS = ("um", "uh", "erm", "hmm", "you know", "i mean", "kind of", "sort of", "basically", "actually")
+
+FEATURES = ("words", "ttr", "sentence_cv", "transitions", "hangul_ratio", "filler_ratio")
+
+# 한글 어절도 단어로 센다 (한국어로만 답해도 길이/한글 비율 특징이 적용되도록)
+_WORD_RE = re.compile(r"[A-Za-z']+|[ㄱ-ㅎ가-힣]+")
+_SENT_RE = re.compile(r"[.!?]+")
+_TRANSITION_RE = re.compile(r"\b(?:" + "|".join(re.escape(t) for t in TRANSITIONS) + r")\b")
+_FILLER_RE = re.compile(r"\b(?:" + "|".join(re.escape(f) for f in FILLERS) + r")\b")
+
+NO_ANSWER = ("", "무응답")
+
+
+def _features(answer: str) -> List[float]:
+    text = (answer or "").strip()
+    if text in NO_ANSWER:
+        return [0.0] * len(FEATURES)
+    lower = text.lower()
+    words = _WORD_RE.findall(lower)
+    n = len(words)
+    sent_lens = np.array([len(_WORD_RE.findall(s)) for s in _SENT_RE.split(lower)], dtype=float)
+    sent_lens = sent_lens[sent_lens > 0]
+    cv = float(sent_lens.std() / sent_lens.mean()) if sent_lens.size > 1 else 0.0
+    chars = len(text.replace(" ", ""))
+    return [
+        float(n),
+        len(set(words)) / n if n else 0.0,
+        cv,
+        float(len(_TRANSITION_RE.findall(lower))),
+        len(HANGUL_RE.findall(text)) / chars if chars else 0.0,
+        len(_FILLER_RE.findall(lower)) / n if n else 0.0,
+    ]
+
+
+def extract_features(answers: List[str]) -> np.ndarray:
+    """답변 목록 → (n, len(FEATURES)) 특징 행렬."""
+    if not answers:
+        return np.zeros((0, len(FEATURES)))
+    return np.array([_features(a) for a in answers], dtype=float)
+
+
+def score_features(feats: np.ndarray) -> np.ndarray:
+    """특징 행렬 → 0~100 정수 점수 (무응답은 0)."""
+    if feats.size == 0:
+        return np.zeros(0, dtype=int)
+    words, ttr, cv, trans, hangul, filler = feats.T
+    # 길이: 80단어 근처에서 포화, 어휘 다양도: 짧은 답변은 TTR이 높게 나오므로 길이로 가중
+    length = np.clip(words / 80.0, 0, 1)
+    diversity = np.clip((ttr - 0.35) / 0.35, 0, 1) * length
+    # 문장 길이 변동: 적당히(CV≈0.3~0.6) 섞인 문장이 자연스러움
+    variety = np.clip(1 - np.abs(cv - 0.45) / 0.45, 0, 1)
+    transitions = np.clip(trans / 3.0, 0, 1)
+    score = (25 + 35 * length + 15 * diversity + 8 * variety + 12 * transitions
+             - 60 * hangul - 40 * np.clip(filler, 0, 0.5))
+    score = np.clip(np.rint(score), 10, 95)
+    return np.where(words > 0, score, 0).astype(int)
+
+
+def score_answers(answers: List[str]) -> List[int]:
+    return score_features(extract_features(answers)).tolist()
+
+
+def heuristic_item(question_num: int, answer: str, feats: np.ndarray = None, score: int = None) -> Dict:
+    """특징으로 문항 피드백(점수/잘한 점/개선점) 구성. LLM 실패 시 fallback으로도 사용."""
+    if feats is None:
+        feats = extract_features([answer])[0]
+    if score is None:
+        score = int(score_features(feats[None, :])[0])
+    words, ttr, cv, trans, hangul, filler = feats
+    strengths, improvements = [], []
+    if score == 0:
+        improvements = ["질문에 답변하기", "개인 경험 포함하기", "구체적인 세부사항 제공"]
+    else:
+        if words >= 60:
+            strengths.append("충분한 길이로 답변함")
+        else:
+            improvements.append("구체적 예시를 더해 60단어 이상으로 답변하기")
+        if ttr >= 0.55 and words >= 20:
+            strengths.append("다양한 어휘를 사용함")
+        if trans >= 2:
+            strengths.append("전환어로 흐름을 잘 연결함")
+        else:
+            improvements.append("However, For example 같은 전환어 사용")
+        if hangul > 0:
+            improvements.append("한국어 대신 영어 표현 사용")
+        if filler > 0.05:
+            improvements.append("군말(um, you know 등) 줄이기")
+        if cv < 0.15 and words >= 20:
+            improvements.append("문장 길이 다양화")
+        if not strengths:
+            strengths.append("질문 의도에 맞춰 응답함")
+    return {
+        "question_num": question_num,
+        "score": score,
+        "strengths": strengths,
+        "improvements": improvements[:3],
+    }
+
+
+def provisional_feedback(answers: List[str]) -> Dict:
+    """전체 답변 예비 채점: 문항별 점수/피드백 + 평균 점수/레벨."""
+    feats = extract_features(answers)
+    floors = np.array([min_score_by_length((a or "").strip()) for a in answers], dtype=int)
+    scores = np.maximum(score_features(feats), floors) if answers else np.zeros(0, dtype=int)
+    items = [heuristic_item(i + 1, a, feats[i], int(scores[i])) for i, a in enumerate(answers)]
+    overall = int(round(float(scores.mean()))) if scores.size else 0
+    return {
+        "overall_score": overall,
+        "opic_level": score_to_level(overall),
+        "individual_feedback": items,
+    }
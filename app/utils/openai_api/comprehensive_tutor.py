@@ -9,14 +9,46 @@ OPIc 9단계 레벨 시스템 기반 종합 피드백 튜터 (안정화 + 동적
 import os
 import json
 import re
-import random
-from typing import Dict, List
+import time
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import OpenAI, APIConnectionError
+
+from app.utils.opic_levels import HANGUL_RE, min_score_by_length, score_to_level
+from app.utils.heuristic_scorer import heuristic_item
 
 load_dotenv()
 
-HANGUL_RE = re.compile(r"[ㄱ-ㅎ가-힣]")
+GRADE_MODEL = "gpt-4o-mini"
+# 채점/모범답안 프롬프트 규칙을 바꾸면 올려서 기존 캐시를 무효화
+PROMPT_VERSION = "3"
+
+# 동시에 진행할 채점 LLM 호출 수 상한
+GRADE_CONCURRENCY = int(os.getenv("GRADE_CONCURRENCY", "4"))
+# 채점 호출 타임아웃: 기본 대기(초) + max_tokens를 최소 생성 속도로 나눈 시간
+# (넘기거나 연결이 안 되면 배치 전체를 로컬 휴리스틱 채점으로 대체)
+GRADE_TIMEOUT = float(os.getenv("GRADE_TIMEOUT", "20"))
+GRADE_MIN_TOKENS_PER_SEC = float(os.getenv("GRADE_MIN_TOKENS_PER_SEC", "40"))
+
+# API 장애로 보는 예외 (타임아웃/연결 실패)
+_UNAVAILABLE_ERRORS = (APIConnectionError, TimeoutError, ConnectionError)
+
+# 배치 계획: 단어 수 기반 토큰 추정으로 한 요청에 담을 문항 수/출력 한도 결정
+GRADE_BATCH_OUTPUT_BUDGET = int(os.getenv("GRADE_BATCH_OUTPUT_BUDGET", "3600"))  # 배치당 출력 토큰 상한
+GRADE_BATCH_INPUT_BUDGET = int(os.getenv("GRADE_BATCH_INPUT_BUDGET", "6000"))    # 배치당 입력 토큰 상한
+GRADE_BATCH_MAX_ITEMS = int(os.getenv("GRADE_BATCH_MAX_ITEMS", "8"))
+TOKENS_PER_WORD = 1.4          # 영어 단어당 토큰 (대략)
+ITEM_FEEDBACK_TOKENS = 180     # 문항당 한국어 strengths/improvements + JSON 키
+SUMMARY_TOKENS = 450           # 배치 응답의 종합 필드(level_description 등)
+
+# 문항별 채점 캐시 (같은 질문+답변은 다시 채점하지 않음)
+GRADE_CACHE_ITEMS = int(os.getenv("GRADE_CACHE_ITEMS", "2048"))
+GRADE_CACHE_TTL = float(os.getenv("GRADE_CACHE_TTL", str(24 * 3600)))  # 초
 
 # ---------------------- 유틸 ---------------------- #
 def _contains_hangul(text: str) -> bool:
@@ -26,31 +58,166 @@ def _word_count(text: str) -> int:
     return len((text or "").strip().split())
 
 
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _skip_ws(s: str, i: int) -> int:
+    while i < len(s) and s[i] in " \t\r\n":
+        i += 1
+    return i
+
+
+def _salvage_feedback_json(text: str) -> Dict:
+    """
+    잘린 채점 응답에서 완성된 부분만 건진다.
+    최상위 객체를 키 단위로 읽어 끝까지 닫힌 값만 취하고,
+    individual_feedback 배열은 원소 단위로 읽어 완성된 문항 객체만 남긴다.
+    """
+    s = (text or "").replace("```json", "").replace("```", "")
+    out: Dict = {}
+    i = s.find("{")
+    if i < 0:
+        return out
+    i += 1
+    try:
+        while True:
+            i = _skip_ws(s, i)
+            if i >= len(s) or s[i] == "}":
+                return out
+            if s[i] == ",":
+                i += 1
+                continue
+            key, i = _JSON_DECODER.raw_decode(s, i)
+            i = _skip_ws(s, i)
+            if i >= len(s) or s[i] != ":":
+                return out
+            i = _skip_ws(s, i + 1)
+            if key == "individual_feedback" and i < len(s) and s[i] == "[":
+                items: List[Dict] = []
+                out[key] = items
+                i += 1
+                while True:
+                    i = _skip_ws(s, i)
+                    if i >= len(s):
+                        return out
+                    if s[i] == ",":
+                        i += 1
+                        continue
+                    if s[i] == "]":
+                        i += 1
+                        break
+                    item, i = _JSON_DECODER.raw_decode(s, i)
+                    if isinstance(item, dict):
+                        items.append(item)
+            else:
+                value, i = _JSON_DECODER.raw_decode(s, i)
+                # 숫자/리터럴은 뒤에 구분자가 와야 끝까지 온 값 ('"overall_score": 7|0' 방지)
+                if not isinstance(value, (str, list, dict)):
+                    j = _skip_ws(s, i)
+                    if j >= len(s) or s[j] not in ",}":
+                        return out
+                out[key] = value
+    except ValueError:
+        # 잘린 지점: 그 전까지 완성된 값만 반환
+        return out
+
+
+def _compact_profile(user_profile: Dict) -> str:
+    """캐시 키용 프로필 요약: 빈 값 제거 + 키 정렬."""
+    compact = {k: v for k, v in (user_profile or {}).items() if v not in (None, "", [], {})}
+    return json.dumps(compact, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _cacheable(item: Dict) -> bool:
+    """휴리스틱 fallback이나 로컬 모범답안이 섞인 문항은 캐시하지 않는다."""
+    return not (item.get("_heuristic") or item.get("_local_sample"))
+
+
+# ---------------------- 채점 캐시 ---------------------- #
+class GradeCache:
+    """(question, answer, profile, PROMPT_VERSION, model) 내용 주소 기반 문항 채점 캐시 (LRU + TTL)."""
+
+    def __init__(self, max_items: int = GRADE_CACHE_ITEMS, ttl: float = GRADE_CACHE_TTL):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(question: str, answer: str, profile: str, model: str = GRADE_MODEL) -> str:
+        raw = json.dumps([question, answer, profile, PROMPT_VERSION, model], ensure_ascii=False)
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=20).hexdigest()
+
+    @staticmethod
+    def summary_key(item_keys: List[str]) -> str:
+        # 종합 평가는 문항 키 집합 전체에 대해 캐시
+        raw = "summary:" + ",".join(item_keys)
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=20).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._items[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def contains(self, key: str) -> bool:
+        """히트/미스 집계 없이 유효한 항목이 있는지만 확인."""
+        with self._lock:
+            entry = self._items.get(key)
+            return entry is not None and time.monotonic() - entry[0] <= self.ttl
+
+    def put(self, key: str, value: Dict) -> None:
+        with self._lock:
+            self._items[key] = (time.monotonic(), copy.deepcopy(value))
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._items),
+                    "hit_rate": round(self.hits / total, 3) if total else 0.0}
+
+
+grade_cache = GradeCache()
+
+
 class ComprehensiveOPIcTutor:
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(self, max_concurrency: int = GRADE_CONCURRENCY):
+        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=1)
+        self.max_concurrency = max(1, max_concurrency)
+        # 배치 채점 + 누락 보정 호출 전체에 걸친 동시 호출 상한
+        self._llm_slots = threading.BoundedSemaphore(self.max_concurrency)
+        # 호출 종류별 LLM 호출 수 (누적)
+        self.call_counts: Dict[str, int] = {}
+        self._count_lock = threading.Lock()
+
+    # ---------- LLM 호출 (동시 호출 상한 + 호출 수 집계) ----------
+    def _chat(self, kind: str, **kwargs):
+        with self._count_lock:
+            self.call_counts[kind] = self.call_counts.get(kind, 0) + 1
+        # 출력 길이에 맞춘 요청별 타임아웃 (긴 배치가 정상 생성 중에 끊기지 않게)
+        kwargs.setdefault("timeout", GRADE_TIMEOUT + kwargs.get("max_tokens", 1000) / GRADE_MIN_TOKENS_PER_SEC)
+        with self._llm_slots:
+            return self.client.chat.completions.create(**kwargs)
 
     # ---------- 레벨 매핑(9단계) ----------
     def _score_to_level(self, score: int) -> str:
-        if score >= 93: return "AL (Advanced Low)"
-        if score >= 88: return "IH (Intermediate High)"
-        if score >= 83: return "IM3 (Intermediate Mid 3)"
-        if score >= 78: return "IM2 (Intermediate Mid 2)"
-        if score >= 73: return "IM1 (Intermediate Mid 1)"
-        if score >= 61: return "IL (Intermediate Low)"
-        if score >= 46: return "NH (Novice High)"
-        if score >= 31: return "NM (Novice Mid)"
-        return "NL (Novice Low)"
+        return score_to_level(score)
 
     # ---------- 하한 점수(답변 길이 기반) ----------
     def _min_floor_by_length(self, answer: str) -> int:
-        if not answer or answer == "무응답":
-            return 0
-        wc = _word_count(answer)
-        if wc >= 40: return 60
-        if wc >= 20: return 50
-        if wc >= 5:  return 40
-        return 30
+        return min_score_by_length(answer)
 
     # ---------- JSON 깨짐 복구 로더 ----------
     def _safe_json_loads(self, s: str) -> dict:
@@ -66,91 +233,142 @@ class ComprehensiveOPIcTutor:
                 s2 += "]" * (s2.count("[") - s2.count("]"))
             return json.loads(s2)
 
-    # ---------- 샘플답안 보정 (동적 길이) ----------
-    def _fix_sample_answer(self, question: str, user_answer: str, sample_answer: str) -> str:
+    # ---------- 모범답안 목표 길이 ----------
+    def _target_range(self, user_answer: str) -> Tuple[int, int]:
         """
-        모범답안 길이를 '사용자 원문'에 맞춰 동적으로 조정:
+        모범답안 길이를 '사용자 원문'에 맞춰 동적으로 결정:
         - 무응답: 60~80 단어
         - 원문 ≤ 80단어: 60~90 단어
         - 81~130단어: [원문, 원문*1.15] (최대 140)
         - 130단어 초과: [원문, 원문*1.10] (최대 180)
-        또한 '원문이 80+ 단어면 절대 원문보다 짧지 않게' 재작성.
         """
-        def _target_range(user_len: int):
-            if user_answer == "무응답":
-                return (60, 80)
-            if user_len <= 80:
-                return (max(60, user_len), 90)
-            if user_len <= 130:
-                return (user_len, min(int(user_len * 1.15), 140))
-            return (user_len, min(int(user_len * 1.10), 180))
-
-        u_wc = _word_count(user_answer or "")
-        tmin, tmax = _target_range(u_wc)
-
-        needs_english = _contains_hangul(sample_answer)
-        wc = _word_count(sample_answer or "")
-        needs_length = wc < tmin or wc > tmax
-        needs_rewrite = needs_english or needs_length or not sample_answer
-
-        if not needs_rewrite and not _contains_hangul(user_answer):
-            return sample_answer
+        if user_answer == "무응답":
+            return (60, 80)
+        user_len = _word_count(user_answer or "")
+        if user_len <= 80:
+            return (max(60, user_len), 90)
+        if user_len <= 130:
+            return (user_len, min(int(user_len * 1.15), 140))
+        return (min(user_len, 180), min(int(user_len * 1.10), 180))  # 180단어 초과 답변도 범위가 뒤집히지 않게
+
+    def _sample_ok(self, sample_answer: str, target: Tuple[int, int]) -> bool:
+        """로컬 검증: 비어 있지 않고, 한글이 없고, 목표 길이 범위 안."""
+        if not (sample_answer or "").strip() or _contains_hangul(sample_answer):
+            return False
+        return target[0] <= _word_count(sample_answer) <= target[1]
+
+    _PAD_SENTENCES = (
+        "Additionally, I added a concrete example and a brief takeaway so the story feels complete and consistent with my original answer.",
+        "For example, I would mention when it happened, who I was with, and how I felt at that moment.",
+        "As a result, the experience taught me something useful that I still think about today.",
+        "However, if I had the chance to do it again, I would plan a little more carefully and enjoy it even more.",
+    )
+
+    def _clamp_sample_length(self, text: str, target: Tuple[int, int]) -> str:
+        """재작성 결과 사후 보정: 한글 제거 후 tmin~tmax 범위로 맞춤."""
+        tmin, tmax = target
+        fixed = re.sub(HANGUL_RE, "", text or "").strip()
+        if _word_count(fixed) > tmax:
+            sentences = re.split(r"(?<=[.!?])\s+", fixed)
+            while _word_count(" ".join(sentences)) > tmax and len(sentences) > 3:
+                sentences.pop()
+            fixed = " ".join(sentences)
+            if _word_count(fixed) > tmax:
+                # 문장이 길어 문장 단위로 못 줄이면 단어 단위로 자름
+                fixed = " ".join(fixed.split()[:tmax]).rstrip(",;:") + "."
+        i = 0
+        while _word_count(fixed) < tmin:
+            fixed = f"{fixed} {self._PAD_SENTENCES[i % len(self._PAD_SENTENCES)]}".strip()
+            i += 1
+        if _word_count(fixed) > tmax:
+            fixed = " ".join(fixed.split()[:tmax]).rstrip(",;:") + "."
+        return fixed
+
+    def _local_sample(self, user_answer: str) -> str:
+        # 재작성 실패 시: 원문 기반 간단 문단
+        base = re.sub(HANGUL_RE, "", (user_answer or "")).strip()
+        if not base or user_answer == "무응답":
+            base = "I would present a clear beginning, a specific example, and a short conclusion."
+        return (
+            f"{base} For example, I explain when it happened and what I did. "
+            f"Additionally, I describe what I learned so the story remains detailed and aligned with my original intent."
+        )
 
+    # ---------- 샘플답안 보정 (위반 문항만 한 번에 재작성) ----------
+    def _fix_sample_answers(self, items: List[Dict], local_fallbacks: Optional[set] = None) -> Dict[int, str]:
+        """
+        items: [{"question_num", "question", "answer", "sample_answer", "target_words": [tmin, tmax]}]
+        로컬 검증을 통과하지 못한 문항만 JSON 배치 1회 호출로 재작성한다.
+        반환: {question_num: 보정된 sample_answer} (위반 문항만)
+        local_fallbacks가 주어지면 재작성에 실패해 _local_sample로 채운 question_num을 담는다.
+        """
+        if not items:
+            return {}
         system = (
             "You are an expert OPIc speaking coach.\n"
-            "Rewrite and EXPAND the model answer IN ENGLISH ONLY.\n"
+            "For EACH item, rewrite and EXPAND the model answer IN ENGLISH ONLY.\n"
             "Rules:\n"
             "- Preserve the user's intent and main ideas; refine grammar, vocabulary, and flow.\n"
             "- Clear opening–body–conclusion with at least TWO transitions "
             "(e.g., However, For example, Additionally, As a result).\n"
             "- Add realistic details that fit the user's answer (no contradictions).\n"
-            f"- TARGET LENGTH: {tmin}-{tmax} words. If the user's answer is long, DO NOT shorten below the user's length.\n"
-            "- Return ONLY the final paragraph (no quotes)."
+            "- TARGET LENGTH: each item's target_words [min, max] words. If the user's answer is long, DO NOT shorten below the user's length.\n"
+            'Return JSON only: {"rewrites": [{"question_num": <int>, "sample_answer": "<final paragraph>"}]}'
         )
-        user = f"""
-Question: {question}
-
-User answer (primary source, {u_wc} words):
-{user_answer or "(empty/very short)"}
-
-Original sample_answer (may be empty/short):
-{sample_answer or "(empty)"}
-"""
-
+        payload = {"items": [
+            {"question_num": it["question_num"],
+             "question": it["question"],
+             "user_answer": it["answer"] if it["answer"] != "무응답" else "(empty/very short)",
+             "original_sample_answer": it.get("sample_answer") or "(empty)",
+             "target_words": list(it["target_words"])}
+            for it in items
+        ]}
+        # 목표 단어 수 × 약 1.5토큰 + 여유
+        max_tokens = min(4000, sum(int(it["target_words"][1] * 1.5) + 40 for it in items) + 100)
+
+        rewritten: Dict[int, str] = {}
         try:
-            resp = self.client.chat.completions.create(
-                model="gpt-4o-mini",
+            resp = self._chat(
+                "sample_rewrite",
+                model=GRADE_MODEL,
                 temperature=0.3,
-                max_tokens=380,
+                max_tokens=max_tokens,
+                response_format={"type": "json_object"},
                 messages=[
                     {"role": "system", "content": system},
-                    {"role": "user", "content": user},
+                    {"role": "user", "content": json.dumps(payload, ensure_ascii=False)},
                 ],
             )
-            fixed = (resp.choices[0].message.content or "").strip()
-            if _contains_hangul(fixed):
-                fixed = re.sub(HANGUL_RE, "", fixed).strip()
-
-            # 사후 길이 보정: tmin~tmax 범위로 맞춤
-            wc2 = _word_count(fixed)
-            if wc2 > tmax:
-                sentences = re.split(r"(?<=[.!?])\s+", fixed)
-                while _word_count(" ".join(sentences)) > tmax and len(sentences) > 3:
-                    sentences.pop()
-                fixed = " ".join(sentences)
-            elif wc2 < tmin:
-                fixed += " Additionally, I added a concrete example and a brief takeaway so the story feels complete and consistent with my original answer."
-            return fixed
-        except Exception:
-            # 실패 시: 원문 기반 간단 문단 + 동적 길이 하한 보정
-            base = re.sub(HANGUL_RE, "", (user_answer or "")).strip()
-            if not base:
-                base = "I would present a clear beginning, a specific example, and a short conclusion."
-            fallback = (
-                f"{base} For example, I explain when it happened and what I did. "
-                f"Additionally, I describe what I learned so the story remains detailed and aligned with my original intent."
+            data = self._safe_json_loads(resp.choices[0].message.content)
+            for r in data.get("rewrites", []):
+                if isinstance(r, dict) and r.get("sample_answer"):
+                    try:
+                        qn = int(r.get("question_num"))  # 모델이 "3"처럼 문자열로 줄 때도 있음
+                    except (TypeError, ValueError):
+                        continue
+                    rewritten[qn] = r["sample_answer"]
+        except Exception as e:
+            print("[sample rewrite error]", e)
+
+        fixed = {}
+        for it in items:
+            text = rewritten.get(it["question_num"])
+            target = tuple(it["target_words"])
+            if not text and local_fallbacks is not None:
+                local_fallbacks.add(it["question_num"])
+            fixed[it["question_num"]] = (
+                self._clamp_sample_length(text or self._local_sample(it["answer"]), target)
             )
-            return fallback
+        return fixed
+
+    def _fix_sample_answer(self, question: str, user_answer: str, sample_answer: str) -> str:
+        """단일 문항용 (호환 유지): 검증 통과 시 그대로, 아니면 배치 재작성 경로로 보정."""
+        target = self._target_range(user_answer)
+        if self._sample_ok(sample_answer, target):
+            return sample_answer
+        item = {"question_num": 0, "question": question, "answer": user_answer or "무응답",
+                "sample_answer": sample_answer, "target_words": list(target)}
+        return self._fix_sample_answers([item])[0]
 
     # ---------- 공통 시스템 프롬프트(배치 채점) ----------
     def _build_system_prompt(self, n_items: int, question_nums: List[int]) -> str:
@@ -178,20 +396,21 @@ Original sample_answer (may be empty/short):
             "}\n\n"
             "- 무응답(\"무응답\")만 0점을 부여. 그 외에는 0점 금지.\n"
             "- sample_answer는 반드시 사용자의 답변을 기반으로 개선하되, 허구의 큰 설정 변경은 금지.\n"
-            "- 길이 규칙: 사용자의 원문이 80단어를 넘는 경우 sample_answer를 원문보다 짧게 만들지 말고, 유사하거나 약간 더 길게 작성할 것.\n"
+            "- 길이 규칙: sample_answer는 각 문항의 target_words [최소, 최대] 단어 수 범위를 반드시 지킬 것(원문보다 짧게 만들지 말 것).\n"
             "- level_description에는 반드시 opic_level 값과 동일한 등급명을 포함할 것.\n"
             "- 모든 응답은 반드시 JSON만 출력할 것(JSON only)."
         )
 
     # ---------- 배치 채점 호출 ----------
-    def _grade_batch(self, qa_batch: List[Dict], user_profile: Dict) -> Dict:
+    def _grade_batch(self, qa_batch: List[Dict], user_profile: Dict, max_tokens: int = 1600) -> Dict:
         sys = self._build_system_prompt(len(qa_batch), [x["question_num"] for x in qa_batch])
         payload = {"user_profile": user_profile, "qa": qa_batch}
         try:
-            resp = self.client.chat.completions.create(
-                model="gpt-4o-mini",
+            resp = self._chat(
+                "batch",
+                model=GRADE_MODEL,
                 temperature=0.2,
-                max_tokens=1600,
+                max_tokens=max_tokens,
                 response_format={"type": "json_object"},
                 messages=[
                     {"role": "system", "content": sys},
@@ -199,10 +418,20 @@ Original sample_answer (may be empty/short):
                 ],
             )
             raw = resp.choices[0].message.content
-            return self._safe_json_loads(raw)
+        except _UNAVAILABLE_ERRORS as e:
+            # API가 느리거나 죽은 경우: 문항별 보정/모범답안 재작성 호출 없이 배치 전체를 로컬 채점
+            print("[batch unavailable]", e.__class__.__name__, "- 휴리스틱 채점으로 대체")
+            return {"individual_feedback": [self._fallback_item(x) for x in qa_batch]}
         except Exception as e:
             print("[batch error]", e)
             return {"individual_feedback": []}
+        try:
+            return self._safe_json_loads(raw)
+        except Exception:
+            # 출력이 중간에 잘린 경우: 완성된 문항만 살리고 나머지만 보정 대상으로 남김
+            fb = _salvage_feedback_json(raw)
+            print(f"[batch truncated] {len(fb.get('individual_feedback', []))}/{len(qa_batch)}개 문항 복구")
+            return fb
 
     # ---------- 단일 문항 채점(보정용) ----------
     def _grade_single(self, item: Dict, user_profile: Dict) -> Dict:
@@ -217,15 +446,16 @@ Original sample_answer (may be empty/short):
             '  "sample_answer": "영어만, 사용자 답변 기반, 2개 이상 전환어, 길이 규칙 준수"\n'
             "}\n"
             "- 무응답(\"무응답\")만 0점. 그 외에는 0점 금지.\n"
-            "- 길이 규칙: 사용자의 원문이 80단어 초과라면 sample_answer를 원문보다 짧게 만들지 말 것.\n"
+            "- 길이 규칙: sample_answer는 item.target_words [최소, 최대] 단어 수 범위를 반드시 지킬 것.\n"
             "- JSON만 출력."
         )
         user = {"user_profile": user_profile, "item": item}
         try:
-            resp = self.client.chat.completions.create(
-                model="gpt-4o-mini",
+            resp = self._chat(
+                "single",
+                model=GRADE_MODEL,
                 temperature=0.2,
-                max_tokens=520,
+                max_tokens=max(520, self._estimate_tokens(item)[1] + 60),
                 response_format={"type": "json_object"},
                 messages=[
                     {"role": "system", "content": sys},
@@ -242,33 +472,143 @@ Original sample_answer (may be empty/short):
         fb = fb or {}
         fb.setdefault("individual_feedback", [])
         got_by_num = {it.get("question_num"): it for it in fb["individual_feedback"] if isinstance(it, dict)}
-        want_nums = [x["question_num"] for x in qa_batch]
 
-        missing = [n for n in want_nums if n not in got_by_num]
-        for num in missing:
-            item = next(x for x in qa_batch if x["question_num"] == num)
-            repaired = self._grade_single(item, user_profile)
-            if not isinstance(repaired, dict) or "question_num" not in repaired:
-                repaired = self._fallback_item(item)
-            got_by_num[num] = repaired
+        missing = [x for x in qa_batch if x["question_num"] not in got_by_num]
+        if missing:
+            # 누락 문항 보정도 동시에 (실제 동시 호출 수는 _llm_slots가 제한)
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(missing))) as pool:
+                repairs = list(pool.map(lambda item: self._grade_single(item, user_profile), missing))
+            for item, repaired in zip(missing, repairs):
+                if not isinstance(repaired, dict) or "question_num" not in repaired:
+                    repaired = self._fallback_item(item)
+                got_by_num[item["question_num"]] = repaired
 
         fb["individual_feedback"] = [got_by_num[n] for n in sorted(got_by_num.keys())]
         return fb
 
-    # ---------- Fallback 개별 문항 ----------
-    def _fallback_item(self, item: Dict) -> Dict:
-        sample_pool = [
-            "I usually structure my answer with a brief opening, a concrete example, and a short conclusion. For example, I explain when it happened and what action I took. Additionally, I describe how I felt and what I learned so the story sounds complete.",
-            "I try to be concise but specific; however, I always include at least one detail such as time, place, or result. For example, mentioning a small outcome makes the answer more convincing.",
-        ]
-        score = 0 if item.get("answer") == "무응답" else max(45, self._min_floor_by_length(item.get("answer", "")))
-        return {
-            "question_num": item["question_num"],
-            "score": score,
-            "strengths": [] if score == 0 else ["질문 의도에 맞춰 응답함"],
-            "improvements": ["구체적 예시 추가", "전환어 사용", "문장 길이 다양화"],
-            "sample_answer": sample_pool[0],
+    def _grade_and_cover(self, qa_batch: List[Dict], user_profile: Dict, max_tokens: int = 1600) -> Dict:
+        fb = self._grade_batch(qa_batch, user_profile, max_tokens)
+        return self._ensure_full_coverage(qa_batch, fb, user_profile)
+
+    # ---------- 배치 계획 (토큰 예산 기반) ----------
+    def _estimate_tokens(self, item: Dict) -> Tuple[int, int]:
+        """문항 하나의 (입력, 출력) 토큰 추정: 질문/답변 단어 수 + 모범답안 목표 길이."""
+        in_words = _word_count(item.get("question", "")) + _word_count(item.get("answer", ""))
+        # 한글 답변은 글자당 토큰이 많아 단어 수보다 넉넉히 잡음
+        in_factor = TOKENS_PER_WORD * (2 if _contains_hangul(item.get("answer", "")) else 1)
+        tmax = item.get("target_words", self._target_range(item.get("answer", "")))[1]
+        return int(in_words * in_factor) + 40, int(tmax * TOKENS_PER_WORD) + ITEM_FEEDBACK_TOKENS
+
+    def _plan_batches(self, qa: List[Dict]) -> List[Tuple[List[Dict], int]]:
+        """
+        문항 순서를 유지하며 출력/입력 토큰 예산 안에서 가능한 한 많이 묶는다 (greedy).
+        반환: [(배치 문항들, 배치 max_tokens)]
+        """
+        plan: List[Tuple[List[Dict], int]] = []
+        batch: List[Dict] = []
+        in_sum = out_sum = 0
+        for item in qa:
+            tin, tout = self._estimate_tokens(item)
+            if batch and (len(batch) >= GRADE_BATCH_MAX_ITEMS
+                          or out_sum + tout + SUMMARY_TOKENS > GRADE_BATCH_OUTPUT_BUDGET
+                          or in_sum + tin > GRADE_BATCH_INPUT_BUDGET):
+                plan.append((batch, out_sum))
+                batch, in_sum, out_sum = [], 0, 0
+            batch.append(item)
+            in_sum += tin
+            out_sum += tout
+        if batch:
+            plan.append((batch, out_sum))
+        # 추정 오차 대비 20% 여유 + 종합 필드
+        return [(b, int(out * 1.2) + SUMMARY_TOKENS) for b, out in plan]
+
+    # ---------- 배치 마무리: 점수 하한 + 모범답안 검증 ----------
+    def _finalize_batch(self, qa_batch: List[Dict], fb: Dict) -> List[Dict]:
+        """배치 채점 결과에 점수 하드가드를 적용하고, 규칙 위반 모범답안만 모아 재작성한다."""
+        items = fb["individual_feedback"]
+        to_rewrite = []
+        for item in items:
+            qn = item.get("question_num")
+            orig = next((x for x in qa_batch if x["question_num"] == qn),
+                        {"question_num": qn, "question": "", "answer": "무응답", "target_words": [60, 80]})
+            # 무응답만 0점
+            if orig["answer"] == "무응답":
+                item["score"] = 0
+                item["strengths"] = []
+                item.setdefault("improvements", ["질문에 답변하기", "개인 경험 포함하기", "구체적인 세부사항 제공"])
+            else:
+                # 답변이 있는데 0점 또는 하한 미만이면 보정
+                try:
+                    cur = int(item.get("score", 0))
+                except Exception:
+                    cur = 0
+                floor = self._min_floor_by_length(orig["answer"])
+                if cur < floor:
+                    item["score"] = floor
+            if item.get("_heuristic"):
+                continue  # 로컬 채점 문항은 이미 길이를 맞춰 둠 (장애 중 재작성 호출 안 함)
+            if not self._sample_ok(item.get("sample_answer", ""), tuple(orig["target_words"])):
+                to_rewrite.append({**orig, "sample_answer": item.get("sample_answer", "")})
+        local = set()
+        rewritten = self._fix_sample_answers(to_rewrite, local)
+        for item in items:
+            if item.get("question_num") in rewritten:
+                item["sample_answer"] = rewritten[item["question_num"]]
+            if item.get("question_num") in local:
+                item["_local_sample"] = True  # LLM 결과가 아니므로 캐시하지 않음
+        return items
+
+    # ---------- 종합 평가 (문항이 이미 채점된 경우) ----------
+    def _summarize(self, items: List[Dict], user_profile: Dict) -> Dict:
+        """문항별 채점 결과만으로 종합 필드(level_description 등)를 한 번에 생성. 실패 시 빈 dict(기본값 사용)."""
+        scores = [int(it.get("score", 0)) for it in items]
+        overall_score = int(round(sum(scores) / len(scores))) if scores else 0
+        opic_level = self._score_to_level(overall_score)
+        sys = (
+            "너는 OPIc 말하기 시험 전문 채점관이다. 문항별 채점 결과를 보고 종합 평가를 한국어로 작성한다.\n"
+            "JSON only:\n"
+            "{\n"
+            '  "level_description": "반드시 주어진 opic_level 등급명을 포함하고, overall_score와 답변 경향을 반영해 상세하게 작성",\n'
+            '  "overall_strengths": ["한국어"],\n'
+            '  "priority_improvements": ["한국어 2~4개"],\n'
+            '  "study_recommendations": "한국어"\n'
+            "}\n"
+            "- JSON만 출력."
+        )
+        payload = {
+            "user_profile": user_profile,
+            "overall_score": overall_score,
+            "opic_level": opic_level,
+            "items": [{k: it.get(k) for k in ("question_num", "score", "strengths", "improvements")} for it in items],
         }
+        try:
+            resp = self._chat(
+                "summary",
+                model=GRADE_MODEL,
+                temperature=0.2,
+                max_tokens=SUMMARY_TOKENS + 200,
+                response_format={"type": "json_object"},
+                messages=[
+                    {"role": "system", "content": sys},
+                    {"role": "user", "content": json.dumps(payload, ensure_ascii=False)},
+                ],
+            )
+            return self._safe_json_loads(resp.choices[0].message.content)
+        except Exception as e:
+            print("[summary error]", e)
+            return {}
+
+    # ---------- Fallback 개별 문항 (로컬 휴리스틱 채점) ----------
+    def _fallback_item(self, item: Dict) -> Dict:
+        answer = item.get("answer", "")
+        fb = heuristic_item(item["question_num"], answer)
+        if answer != "무응답":
+            fb["score"] = max(fb["score"], self._min_floor_by_length(answer))
+        # 모범답안도 로컬로 목표 길이에 맞춰 두어 재작성 호출 대상이 되지 않게 함
+        target = tuple(item.get("target_words") or self._target_range(answer))
+        fb["sample_answer"] = self._clamp_sample_length(self._local_sample(answer), target)
+        fb["_heuristic"] = True
+        return fb
 
     # ---------- 빈/기본 응답 ----------
     def _empty_feedback(self) -> Dict:
@@ -283,49 +623,125 @@ Original sample_answer (may be empty/short):
             "_debug_used_fallback": True,
         }
 
-    # ---------- 헬퍼 ----------
-    def _chunks(self, arr, size):
-        for i in range(0, len(arr), size):
-            yield arr[i:i+size]
-
     # ---------- 메인 엔드포인트 ----------
-    def get_comprehensive_feedback(self, questions: List[str], answers: List[str], user_profile: Dict) -> Dict:
-        # 0) 전체 QA 구성
+    def _build_all_qa(self, questions: List[str], answers: List[str]) -> List[Dict]:
+        # 전체 QA 구성 + 모범답안 목표 길이를 미리 계산해 채점 프롬프트에 함께 전달
         all_qa = [{"question_num": i + 1,
                    "question": q,
                    "answer": (a or "").strip() if (a and a.strip()) else "무응답"}
                   for i, (q, a) in enumerate(zip(questions, answers))]
+        for x in all_qa:
+            x["target_words"] = list(self._target_range(x["answer"]))
+        return all_qa
 
+    def _item_keys(self, all_qa: List[Dict], user_profile: Dict) -> Dict[int, str]:
+        profile = _compact_profile(user_profile)
+        return {x["question_num"]: grade_cache.make_key(x["question"], x["answer"], profile) for x in all_qa}
+
+    def _iter_graded_batches(self, qa: List[Dict], user_profile: Dict, keys: Dict[int, str]):
+        """
+        토큰 예산에 맞춰 배치를 짜고, 배치들을 동시에 채점해 끝나는 순서대로 (배치 번호, fb)를 내보낸다.
+        채점된 문항은 바로 grade_cache에 저장.
+        """
+        plan = self._plan_batches(qa)
+
+        def _run(idx: int):
+            batch, max_tokens = plan[idx]
+            fb = self._grade_and_cover(batch, user_profile, max_tokens)
+            self._finalize_batch(batch, fb)
+            for item in fb["individual_feedback"]:
+                # 실제 LLM 결과만 캐시 (장애 중 만든 휴리스틱/로컬 모범답안은 다음 실행에서 다시 채점)
+                if item.get("question_num") in keys and _cacheable(item):
+                    grade_cache.put(keys[item["question_num"]], item)
+            return idx, fb
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(plan))) as pool:
+            futures = [pool.submit(_run, idx) for idx in range(len(plan))]
+            for fut in as_completed(futures):
+                yield fut.result()
+
+    def pregrade(self, pairs: List[Tuple[str, str]], user_profile: Dict) -> int:
+        """
+        (질문, 답변) 목록을 배치 경로로 미리 채점해 grade_cache만 채운다 (시험 진행 중 백그라운드용).
+        이미 캐시에 있는 문항은 건너뜀. 새로 채점한 문항 수 반환.
+        """
+        all_qa = self._build_all_qa([q for q, _ in pairs], [a for _, a in pairs])
+        keys = self._item_keys(all_qa, user_profile)
+        todo = [x for x in all_qa if not grade_cache.contains(keys[x["question_num"]])]
+        if not todo:
+            return 0
+        for _ in self._iter_graded_batches(todo, user_profile, keys):
+            pass
+        return len(todo)
+
+    def iter_comprehensive_feedback(self, questions: List[str], answers: List[str], user_profile: Dict):
+        """
+        배치가 끝나는 대로 채점 결과를 하나씩 내보내는 스트리밍 버전.
+        - ("item", 문항 피드백): 점수 하한/모범답안 보정까지 끝난 문항 (캐시 히트 먼저, 이후 배치 완료 순서)
+        - ("summary", 종합 결과): 마지막에 한 번, get_comprehensive_feedback과 같은 dict
+        """
+        all_qa = self._build_all_qa(questions, answers)
         if not all_qa:
-            return self._empty_feedback()
+            yield "summary", self._empty_feedback()
+            return
+        calls_before = dict(self.call_counts)
+
+        # 캐시(이전 채점/백그라운드 사전 채점)에 있는 문항은 바로 내보내고, 나머지만 LLM으로 채점
+        keys = self._item_keys(all_qa, user_profile)
+        items: List[Dict] = []
+        misses: List[Dict] = []
+        for x in all_qa:
+            cached = grade_cache.get(keys[x["question_num"]])
+            if cached is None:
+                misses.append(x)
+                continue
+            cached["question_num"] = x["question_num"]
+            items.append(cached)
+            yield "item", cached
+
+        n_batches = 0
+        last_fb: Dict = {}
+        if misses:
+            graded: Dict[int, Dict] = {}
+            for idx, fb in self._iter_graded_batches(misses, user_profile, keys):
+                graded[idx] = fb
+                for item in fb["individual_feedback"]:
+                    items.append(item)
+                    yield "item", item
+            n_batches = len(graded)
+            last_fb = {k: v for k, v in graded[n_batches - 1].items() if k != "individual_feedback"}
+
+        # 문항은 question_num 순으로 병합
+        items.sort(key=lambda it: it.get("question_num", 0))
+
+        # 종합 필드: 전부 이번에 채점했으면 기존처럼 마지막 배치 응답 기준,
+        # 캐시 문항이 섞여 있으면 전체 문항 결과로 종합 평가 1회 호출
+        summary_key = grade_cache.summary_key([keys[x["question_num"]] for x in all_qa])
+        if len(misses) < len(all_qa):
+            last_fb = grade_cache.get(summary_key) or self._summarize(items, user_profile)
+        if last_fb:
+            grade_cache.put(summary_key, last_fb)
+
+        summary = self._build_summary(items, last_fb, calls_before)
+        summary["_debug_cache"] = {"hits": len(all_qa) - len(misses), "misses": len(misses)}
+        repairs = summary["_debug_llm_calls"].get("single", 0)
+        summary["_debug_batches"] = {
+            "batches": n_batches,
+            "items": len(misses),
+            "repairs": repairs,
+            "repair_rate": round(repairs / len(misses), 3) if misses else 0.0,
+        }
+        yield "summary", summary
 
-        # 1) 배치로 채점 시도 (4개 단위 추천)
-        merged_feedback = {"individual_feedback": []}
-        for batch in self._chunks(all_qa, 4):
-            fb = self._grade_batch(batch, user_profile)
-            fb = self._ensure_full_coverage(batch, fb, user_profile)
-            merged_feedback["individual_feedback"].extend(fb["individual_feedback"])
+    def get_comprehensive_feedback(self, questions: List[str], answers: List[str], user_profile: Dict) -> Dict:
+        summary = self._empty_feedback()
+        for kind, payload in self.iter_comprehensive_feedback(questions, answers, user_profile):
+            if kind == "summary":
+                summary = payload
+        return summary
 
-        # 2) 점수 하드가드 + 모범답안 동적 길이 보정
-        for item in merged_feedback["individual_feedback"]:
-            qn = item.get("question_num")
-            orig = next((x for x in all_qa if x["question_num"] == qn), {"question": "", "answer": "무응답"})
-            # 무응답만 0점
-            if orig["answer"] == "무응답":
-                item["score"] = 0
-                item["strengths"] = []
-                item.setdefault("improvements", ["질문에 답변하기", "개인 경험 포함하기", "구체적인 세부사항 제공"])
-            else:
-                # 답변이 있는데 0점 또는 하한 미만이면 보정
-                try:
-                    cur = int(item.get("score", 0))
-                except Exception:
-                    cur = 0
-                floor = self._min_floor_by_length(orig["answer"])
-                if cur < floor:
-                    item["score"] = floor
-            # 모범답안 동적 길이 보정
-            item["sample_answer"] = self._fix_sample_answer(orig["question"], orig["answer"], item.get("sample_answer", ""))
+    def _build_summary(self, items: List[Dict], fb: Dict, calls_before: Dict[str, int]) -> Dict:
+        merged_feedback = {"individual_feedback": items}
 
         # 3) 전체 점수/레벨 계산
         scores = [int(it.get("score", 0)) for it in merged_feedback["individual_feedback"]]
@@ -363,6 +779,8 @@ Original sample_answer (may be empty/short):
             "overall_strengths": overall_strengths if overall_strengths is not None else (["대부분의 질문에 응답함"] if scores else []),
             "priority_improvements": priority_improvements if priority_improvements is not None else ["구체적인 예시 추가", "자연스러운 연결어 사용", "문장 구조 다양화"],
             "study_recommendations": study_recommendations if study_recommendations is not None else "각 답변을 45~60초로 정규화하고, Although/Meanwhile/On top of that 등 다양한 연결어를 섞어 연습하세요.",
+            "_debug_llm_calls": {k: v - calls_before.get(k, 0) for k, v in self.call_counts.items()
+                                 if v - calls_before.get(k, 0)},
         }
 
 
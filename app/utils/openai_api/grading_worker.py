@@ -0,0 +1,151 @@
+# 시험 진행 중 백그라운드 채점 워커
+"""
+피드백 버튼을 누를 때 LLM 지연이 한꺼번에 몰리지 않도록 시험 도중 미리 채점해 둔다.
+- show_exam의 → Next가 (질문, 답변, 프로필)을 세션별 버퍼에 넣고 Future를 받아 둠
+- 세션 버퍼가 GRADE_WORKER_GROUP개가 되거나 GRADE_WORKER_LINGER초가 지나면
+  공용 스레드 풀(GRADE_WORKER_THREADS)에서 ComprehensiveOPIcTutor.pregrade(배치 채점 경로)로 채점
+- 워커 전용 튜터 하나를 공유하므로 백그라운드 채점 전체의 LLM 동시 호출은 GRADE_WORKER_LLM_CONCURRENCY로 제한
+- 결과는 grade_cache에 쌓이므로 피드백 페이지에서는 남은 문항 + 종합 평가만 호출하면 된다
+- 피드백 페이지는 자기 세션 버퍼만 즉시 채점시키고(flush) 자기 Future만 기다린다
+"""
+import os
+import copy
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+from app.utils.openai_api.comprehensive_tutor import ComprehensiveOPIcTutor, _compact_profile
+
+GRADING_WORKER_ENABLED = os.getenv("OPIC_BACKGROUND_GRADING", "1") == "1"
+GRADE_WORKER_GROUP = int(os.getenv("GRADE_WORKER_GROUP", "4"))          # 한 번에 묶을 최대 답변 수
+GRADE_WORKER_LINGER = float(os.getenv("GRADE_WORKER_LINGER", "60"))     # 다음 답변을 기다리는 최대 시간(초)
+GRADE_WORKER_THREADS = int(os.getenv("GRADE_WORKER_THREADS", "4"))      # 동시에 채점할 그룹 수 (프로세스 전체)
+GRADE_WORKER_WAIT = float(os.getenv("GRADE_WORKER_WAIT", "60"))         # 피드백 페이지에서 남은 채점 대기(초)
+# 백그라운드 채점 전체의 동시 LLM 호출 상한 (워커 전용 튜터 하나를 모든 그룹이 공유하므로 프로세스 전체 기준,
+# 피드백 페이지 튜터의 GRADE_CONCURRENCY와는 별개)
+GRADE_WORKER_LLM_CONCURRENCY = int(os.getenv("GRADE_WORKER_LLM_CONCURRENCY", "8"))
+
+_Job = Tuple[str, str, Dict, Future]
+
+
+class GradingWorker:
+    """세션별로 답변을 모아 공용 스레드 풀에서 배치로 미리 채점한다 (프로세스당 하나)."""
+
+    def __init__(self, group_size: int = GRADE_WORKER_GROUP, linger: float = GRADE_WORKER_LINGER,
+                 max_workers: int = GRADE_WORKER_THREADS, llm_concurrency: int = GRADE_WORKER_LLM_CONCURRENCY):
+        self.group_size = max(1, group_size)
+        self.linger = linger
+        self.llm_concurrency = llm_concurrency
+        self.graded = 0
+        self.failed = 0
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="grading")
+        self._tutor: Optional[ComprehensiveOPIcTutor] = None
+        self._lock = threading.Lock()
+        self._buffers: Dict[str, List[_Job]] = {}
+        self._deadlines: Dict[str, float] = {}
+        self._wakeup = threading.Event()
+        threading.Thread(target=self._dispatch_loop, name="grading-dispatch", daemon=True).start()
+
+    def submit(self, session_id: str, question: str, answer: str, user_profile: Dict) -> Future:
+        """답변 하나를 세션 버퍼에 넣고, 채점이 끝나면 완료되는 Future를 반환."""
+        fut: Future = Future()
+        job = (question, answer, copy.deepcopy(user_profile or {}), fut)
+        with self._lock:
+            buf = self._buffers.setdefault(session_id, [])
+            if not buf:
+                self._deadlines[session_id] = time.monotonic() + self.linger
+            buf.append(job)
+            group = self._take(session_id) if len(buf) >= self.group_size else None
+        if group:
+            self._executor.submit(self._run_group, group)
+        else:
+            self._wakeup.set()
+        return fut
+
+    def flush(self, session_id: str) -> None:
+        """이 세션 버퍼에 모인 답변을 기다리지 않고 바로 채점 (다른 세션에는 영향 없음)."""
+        with self._lock:
+            group = self._take(session_id)
+        if group:
+            self._executor.submit(self._run_group, group)
+
+    def _take(self, session_id: str) -> List[_Job]:
+        # _lock을 잡은 상태에서 호출
+        self._deadlines.pop(session_id, None)
+        return self._buffers.pop(session_id, [])
+
+    def _dispatch_loop(self) -> None:
+        """linger 시간이 지난 세션 버퍼를 풀에 넘긴다."""
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                expired = [sid for sid, t in self._deadlines.items() if t <= now]
+                groups = [self._take(sid) for sid in expired]
+                next_deadline = min(self._deadlines.values(), default=None)
+            for group in groups:
+                if group:
+                    self._executor.submit(self._run_group, group)
+            self._wakeup.wait(None if next_deadline is None else max(0.0, next_deadline - time.monotonic()))
+            self._wakeup.clear()
+
+    def _get_tutor(self) -> ComprehensiveOPIcTutor:
+        # 생성 실패(키 없음 등)는 호출 측 try에서 Future 예외로 전달
+        with self._lock:
+            if self._tutor is None:
+                self._tutor = ComprehensiveOPIcTutor(max_concurrency=self.llm_concurrency)
+            return self._tutor
+
+    def _run_group(self, group: List[_Job]) -> None:
+        # 같은 프로필끼리 묶어 배치 채점 (캐시 키가 프로필에 따라 달라짐)
+        by_profile: Dict[str, Tuple[Dict, List[_Job]]] = {}
+        for job in group:
+            by_profile.setdefault(_compact_profile(job[2]), (job[2], []))[1].append(job)
+        for profile, jobs in by_profile.values():
+            try:
+                n = self._get_tutor().pregrade([(q, a) for q, a, _, _ in jobs], profile)
+                self.graded += n
+                for *_, fut in jobs:
+                    fut.set_result(True)
+            except Exception as e:
+                self.failed += len(jobs)
+                print(f"[grading-worker] 오류: {e.__class__.__name__} - {e}")
+                for *_, fut in jobs:
+                    fut.set_exception(e)
+
+
+_worker: Optional[GradingWorker] = None
+_worker_lock = threading.Lock()
+
+
+def get_grading_worker() -> Optional[GradingWorker]:
+    """프로세스 공용 워커 (OPIC_BACKGROUND_GRADING=0이면 None)."""
+    global _worker
+    if not GRADING_WORKER_ENABLED:
+        return None
+    with _worker_lock:
+        if _worker is None:
+            _worker = GradingWorker()
+    return _worker
+
+
+def submit_for_grading(session_id: str, question: str, answer: str, user_profile: Dict) -> Optional[Future]:
+    worker = get_grading_worker()
+    if worker is None or not question:
+        return None
+    return worker.submit(session_id, question, answer, user_profile)
+
+
+def wait_for_background_grading(session_id: Optional[str], futures: List[Future],
+                                timeout: Optional[float] = GRADE_WORKER_WAIT) -> bool:
+    """
+    피드백 생성 전에 이 세션의 사전 채점만 마무리한다.
+    버퍼에 남은 답변은 바로 채점시키고, 이 세션이 넘긴 Future만 기다린다. 모두 끝났으면 True.
+    """
+    futures = [f for f in futures if f is not None]
+    if _worker is None or not futures:
+        return True
+    if session_id:
+        _worker.flush(session_id)
+    _, not_done = wait(futures, timeout=timeout)
+    return not not_done
@@ -0,0 +1,28 @@
+# OPIc 채점 공용 상수/함수 (튜터와 휴리스틱 채점기가 함께 사용)
+import re
+
+HANGUL_RE = re.compile(r"[ㄱ-ㅎ가-힣]")
+
+
+def score_to_level(score: int) -> str:
+    """0~100 점수 → OPIc 9단계 레벨."""
+    if score >= 93: return "AL (Advanced Low)"
+    if score >= 88: return "IH (Intermediate High)"
+    if score >= 83: return "IM3 (Intermediate Mid 3)"
+    if score >= 78: return "IM2 (Intermediate Mid 2)"
+    if score >= 73: return "IM1 (Intermediate Mid 1)"
+    if score >= 61: return "IL (Intermediate Low)"
+    if score >= 46: return "NH (Novice High)"
+    if score >= 31: return "NM (Novice Mid)"
+    return "NL (Novice Low)"
+
+
+def min_score_by_length(answer: str) -> int:
+    """답변 길이별 점수 하한. 무응답만 0점, 답변이 있으면 최소 30점."""
+    if not answer or answer == "무응답":
+        return 0
+    wc = len(answer.strip().split())
+    if wc >= 40: return 60
+    if wc >= 20: return 50
+    if wc >= 5:  return 40
+    return 30
@@ -7,31 +7,569 @@ OPIc 시험용 통합 음성 기능 유틸리티
 
 import io
 import os
+import base64
+import re
+import json
+import time
+import wave
+import hashlib
+import heapq
+import itertools
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
 import streamlit as st
+import streamlit.components.v1 as components
 from openai import OpenAI
 
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# TTS 기본 설정
+TTS_MODEL = "tts-1"
+TTS_VOICE = "alloy"  # 선택: alloy, echo, fable, onyx, nova, shimmer
+TTS_FORMAT = "mp3"
+
+# TTS 캐시: 프로세스 메모리 LRU + 디스크(용량 상한) 2단계, 모든 세션이 공유
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(ROOT, "data", "tts_cache"))
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+TTS_CACHE_MEMORY_ITEMS = int(os.getenv("TTS_CACHE_MEMORY_ITEMS", "256"))
+
+# 긴 텍스트 스트리밍 TTS (문장 묶음당 최대 단어 수 / 동시 합성 수)
+TTS_STREAM_SEGMENT_WORDS = int(os.getenv("TTS_STREAM_SEGMENT_WORDS", "40"))
+TTS_STREAM_WORKERS = int(os.getenv("TTS_STREAM_WORKERS", "4"))
+
+# STT 기본 설정 / 전사 결과 메모 캐시 크기
+STT_MODEL = "whisper-1"
+STT_LANGUAGE = "en"
+STT_CACHE_ITEMS = int(os.getenv("STT_CACHE_ITEMS", "512"))
+
+# STT 업로드 전 전처리 (모노 / 16kHz / 앞뒤 무음 제거 / 16bit PCM)
+STT_PREPROCESS = os.getenv("STT_PREPROCESS", "1") != "0"
+STT_TARGET_RATE = 16000
+VAD_FRAME_MS = 30
+VAD_THRESHOLD_DB = float(os.getenv("VAD_THRESHOLD_DB", "-35"))  # 최대 프레임 에너지 대비
+VAD_PAD_MS = 200
+
+# 긴 답변 분할 전사 (이보다 길면 분할 / 조각 목표 길이 / 조각 간 겹침 / 동시 요청 수)
+STT_CHUNK_THRESHOLD_S = float(os.getenv("STT_CHUNK_THRESHOLD_S", "30"))
+STT_CHUNK_TARGET_S = float(os.getenv("STT_CHUNK_TARGET_S", "15"))
+STT_CHUNK_OVERLAP_S = float(os.getenv("STT_CHUNK_OVERLAP_S", "1.0"))
+STT_CHUNK_WORKERS = int(os.getenv("STT_CHUNK_WORKERS", "4"))
+
+# 백그라운드 전사 (프로세스 공용 스레드 수 / UI 폴링 주기 초 / 보관할 작업 수)
+STT_WORKERS = int(os.getenv("STT_WORKERS", "4"))
+STT_POLL_INTERVAL = float(os.getenv("STT_POLL_INTERVAL", "1.0"))
+STT_MAX_JOBS = 1000
+
+# 사이드바에 음성 처리 누적 통계 표시 (운영 확인용)
+VOICE_METRICS_PANEL = os.getenv("OPIC_SHOW_METRICS", "0") == "1"
+
+# 시험 문항 TTS 미리 합성 (동시 스레드 수 / 현재 문항 대기 상한 초)
+TTS_PREFETCH_WORKERS = int(os.getenv("TTS_PREFETCH_WORKERS", "4"))
+TTS_PREFETCH_WAIT = float(os.getenv("TTS_PREFETCH_WAIT", "20"))
+
+
+class TTSCache:
+    """(text, voice, model, format) 내용 주소 기반 TTS 오디오 캐시."""
+
+    def __init__(self, cache_dir: str = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES,
+                 memory_items: int = TTS_CACHE_MEMORY_ITEMS):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._disk_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(text: str, voice: str, model: str, fmt: str) -> str:
+        raw = json.dumps([text, voice, model, fmt], ensure_ascii=False)
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=20).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def _remember(self, key: str, data: bytes) -> None:
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return data
+            if not self.cache_dir:
+                self.misses += 1
+                return None
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+            os.utime(self._path(key))  # 디스크 LRU용 사용 시각 갱신
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self._remember(key, data)
+            self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if not data:
+            return
+        with self._lock:
+            self._remember(key, data)
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{self._path(key)}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._path(key))
+            with self._lock:
+                if self._disk_bytes is None:
+                    self._disk_bytes = self._scan_disk_bytes()
+                else:
+                    self._disk_bytes += len(data)
+                if self._disk_bytes > self.max_bytes:
+                    self._evict_disk()
+        except OSError as e:
+            print(f"TTS 캐시 저장 실패: {e}")
+
+    def _scan_disk_bytes(self) -> int:
+        return sum(e.stat().st_size for e in os.scandir(self.cache_dir) if e.is_file())
+
+    def _evict_disk(self) -> None:
+        """오래 안 쓰인 파일부터 지워 용량 상한의 90%까지 줄인다."""
+        entries = sorted((e for e in os.scandir(self.cache_dir) if e.is_file()),
+                         key=lambda e: e.stat().st_mtime)
+        total = sum(e.stat().st_size for e in entries)
+        target = int(self.max_bytes * 0.9)
+        for e in entries:
+            if total <= target:
+                break
+            try:
+                size = e.stat().st_size
+                os.remove(e.path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+
+# 프로세스 전역 캐시 (Streamlit 세션 간 공유)
+tts_cache = TTSCache()
+
+
+# ---------------------- STT 오디오 전처리 ---------------------- #
+def decode_wav(data: bytes) -> Tuple[np.ndarray, int]:
+    """WAV 바이트 → (float32 [-1, 1] 샘플 (frames, channels), 샘플레이트)."""
+    with wave.open(io.BytesIO(data), "rb") as w:
+        channels, width, rate = w.getnchannels(), w.getsampwidth(), w.getframerate()
+        raw = w.readframes(w.getnframes())
+    if width == 1:
+        x = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        x = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        v = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        v = np.where(v >= 1 << 23, v - (1 << 24), v)
+        x = v.astype(np.float32) / float(1 << 23)
+    elif width == 4:
+        x = np.frombuffer(raw, dtype="<i4").astype(np.float32) / float(1 << 31)
+    else:
+        raise ValueError(f"지원하지 않는 샘플 폭: {width}")
+    return x.reshape(-1, channels), rate
+
+
+def encode_wav(x: np.ndarray, rate: int) -> bytes:
+    """모노 float 샘플 → 16bit PCM WAV 바이트."""
+    pcm = (np.clip(x, -1.0, 1.0) * 32767.0).astype("<i2")
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+def downmix(x: np.ndarray) -> np.ndarray:
+    return x.mean(axis=1) if x.ndim == 2 else x
+
+
+def resample(x: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    """윈도 sinc 저역통과(다운샘플 시) + 선형 보간 리샘플."""
+    if src_rate == dst_rate or len(x) == 0:
+        return x
+    if dst_rate < src_rate:
+        cutoff = 0.5 * dst_rate / src_rate
+        n = np.arange(63) - 31
+        taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(63)
+        x = np.convolve(x, taps / taps.sum(), mode="same")
+    n_out = int(round(len(x) * dst_rate / src_rate))
+    t_out = np.arange(n_out) * (src_rate / dst_rate)
+    return np.interp(t_out, np.arange(len(x)), x).astype(np.float32)
+
+
+def trim_silence(x: np.ndarray, rate: int, frame_ms: int = VAD_FRAME_MS,
+                 threshold_db: float = VAD_THRESHOLD_DB, pad_ms: int = VAD_PAD_MS) -> np.ndarray:
+    """프레임 RMS 에너지 기반 VAD로 앞뒤 무음을 잘라낸다 (말소리가 없으면 그대로 반환)."""
+    frame = max(1, rate * frame_ms // 1000)
+    n_frames = len(x) // frame
+    if n_frames == 0:
+        return x
+    rms = np.sqrt(np.mean(x[:n_frames * frame].reshape(n_frames, frame) ** 2, axis=1) + 1e-12)
+    db = 20 * np.log10(rms / rms.max())
+    voiced = np.flatnonzero((db > threshold_db) & (rms > 1e-4))
+    if len(voiced) == 0:
+        return x
+    pad = rate * pad_ms // 1000
+    start = max(0, voiced[0] * frame - pad)
+    end = min(len(x), (voiced[-1] + 1) * frame + pad)
+    return x[start:end]
+
+
+def preprocess_for_stt(audio_bytes: bytes) -> bytes:
+    """브라우저 WAV → 모노 16kHz, 앞뒤 무음 제거, 16bit PCM. WAV가 아니면 원본 그대로."""
+    try:
+        x, rate = decode_wav(audio_bytes)
+    except (wave.Error, EOFError, ValueError):
+        return audio_bytes
+    mono = resample(downmix(x), rate, STT_TARGET_RATE)
+    out = encode_wav(trim_silence(mono, STT_TARGET_RATE), STT_TARGET_RATE)
+    return out if len(out) < len(audio_bytes) else audio_bytes
+
+
+def find_split_points(x: np.ndarray, rate: int, target_s: float = STT_CHUNK_TARGET_S,
+                      search_s: float = 3.0, frame_ms: int = VAD_FRAME_MS) -> List[int]:
+    """목표 길이마다 앞뒤 search_s 안에서 에너지가 가장 낮은 프레임을 분할 지점으로 고른다."""
+    frame = max(1, rate * frame_ms // 1000)
+    n_frames = len(x) // frame
+    if n_frames == 0:
+        return []
+    energy = np.mean(x[:n_frames * frame].reshape(n_frames, frame) ** 2, axis=1)
+    target = int(target_s * rate)
+    search = min(int(search_s * rate), target // 2)  # 탐색 창이 직전 분할 지점 앞으로 넘어가지 않게
+    points: List[int] = []
+    pos = 0
+    while len(x) - pos > target + search:
+        lo = max((pos + target - search) // frame, pos // frame + 1)  # 분할 지점은 항상 앞으로 전진
+        hi = min(n_frames, (pos + target + search) // frame)
+        if lo >= hi:
+            break
+        cut = (lo + int(np.argmin(energy[lo:hi]))) * frame + frame // 2
+        points.append(cut)
+        pos = cut
+    return points
+
+
+def split_wav_for_stt(audio_bytes: bytes, threshold_s: float = STT_CHUNK_THRESHOLD_S,
+                      overlap_s: float = STT_CHUNK_OVERLAP_S) -> List[bytes]:
+    """threshold_s보다 긴 WAV를 무음 지점에서 겹치는 조각 WAV들로 나눈다 (짧거나 WAV가 아니면 그대로)."""
+    try:
+        x, rate = decode_wav(audio_bytes)
+    except (wave.Error, EOFError, ValueError):
+        return [audio_bytes]
+    x = downmix(x)
+    if len(x) <= threshold_s * rate:
+        return [audio_bytes]
+    overlap = int(overlap_s * rate)
+    bounds = [0] + find_split_points(x, rate) + [len(x)]
+    return [encode_wav(x[max(0, start - overlap):end], rate)
+            for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def _norm_word(w: str) -> str:
+    return re.sub(r"[^\w']", "", w.lower())
+
+
+def stitch_transcripts(texts: List[str], max_overlap_words: int = 8) -> str:
+    """조각 전사문을 순서대로 잇되, 앞 조각 끝과 겹치는 다음 조각 앞부분 단어를 제거한다."""
+    words: List[str] = []
+    for text in texts:
+        nxt = text.split()
+        limit = min(max_overlap_words, len(words), len(nxt))
+        for k in range(limit, 0, -1):
+            if [_norm_word(w) for w in words[-k:]] == [_norm_word(w) for w in nxt[:k]]:
+                nxt = nxt[k:]
+                break
+        words.extend(nxt)
+    return " ".join(words)
+
+
+class STTMetrics:
+    """업로드 바이트 절감량과 Whisper 지연 시간 누적 통계."""
+
+    def __init__(self):
+        self.requests = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, bytes_in: int, bytes_out: int, seconds: float) -> None:
+        with self._lock:
+            self.requests += 1
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.seconds += seconds
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            n = max(self.requests, 1)
+            return {
+                "requests": self.requests,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "bytes_saved_ratio": 1 - self.bytes_out / self.bytes_in if self.bytes_in else 0.0,
+                "avg_latency_s": self.seconds / n,
+            }
+
+
+stt_metrics = STTMetrics()
+
+
+class STTCache:
+    """
+    오디오 내용 해시(BLAKE2) → 전사 결과 메모 캐시 + single-flight.
+    같은 녹음이 동시에 여러 번 요청돼도 Whisper 호출은 한 번만 일어난다.
+    실패한 결과는 저장하지 않아 다음 요청에서 다시 시도한다.
+    """
+
+    def __init__(self, max_items: int = STT_CACHE_ITEMS):
+        self.max_items = max_items
+        self.hits = 0
+        self.misses = 0
+        self._results: "OrderedDict[str, str]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(audio_bytes: bytes, model: str, language: str) -> str:
+        h = hashlib.blake2b(audio_bytes, digest_size=20)
+        h.update(f"|{model}|{language}".encode("utf-8"))
+        return h.hexdigest()
+
+    def get_or_compute(self, key: str, compute: Callable[[], str]) -> str:
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return self._results[key]
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+            else:
+                self.hits += 1
+        if not leader:
+            return future.result()
+
+        try:
+            text = compute()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._results[key] = text
+            while len(self._results) > self.max_items:
+                self._results.popitem(last=False)
+            self._inflight.pop(key, None)
+        future.set_result(text)
+        return text
+
+
+# 프로세스 전역 전사 캐시
+stt_cache = STTCache()
+
+# 분할 전사 조각용 실행기 (백그라운드 전사 실행기 안에서 호출되므로 별도 풀)
+_stt_chunk_executor = ThreadPoolExecutor(max_workers=STT_CHUNK_WORKERS, thread_name_prefix="stt-chunk")
+
+
+def split_tts_segments(text: str, max_words: int = TTS_STREAM_SEGMENT_WORDS) -> List[str]:
+    """문장 경계에서 자르고, 첫 문장은 단독으로, 이후는 max_words 이내로 묶는다."""
+    sentences = [x for x in re.split(r"(?<=[.!?])\s+", (text or "").strip()) if x]
+    segments: List[str] = []
+    for sentence in sentences:
+        if len(segments) > 1 and len(segments[-1].split()) + len(sentence.split()) <= max_words:
+            segments[-1] = f"{segments[-1]} {sentence}"
+        else:
+            segments.append(sentence)
+    return segments
+
+
+def play_audio_queue(segments: List[bytes], fmt: str = TTS_FORMAT, autoplay: bool = True,
+                     state_key: Optional[str] = None, done: bool = True) -> None:
+    """
+    오디오 조각들을 플레이어 하나에서 끊김 없이 이어서 재생 (ended 이벤트로 다음 조각).
+    state_key가 있으면 재생 위치를 브라우저 localStorage에 남겨, 조각이 늘어 다시 그려져도 이어서 재생한다.
+    done=False면 마지막 조각이 끝난 뒤 다음 조각이 도착(재렌더)할 때까지 기다린다.
+    """
+    if not segments:
+        return
+    mime = "audio/mpeg" if fmt == "mp3" else f"audio/{fmt}"
+    srcs = [f"data:{mime};base64,{base64.b64encode(seg).decode()}" for seg in segments]
+    components.html(
+        f"""<audio id="tts-queue" controls style="width:100%"></audio>
+<script>
+const srcs = {json.dumps(srcs)};
+const key = {json.dumps(state_key)};
+const done = {json.dumps(done)};
+const player = document.getElementById("tts-queue");
+let state = {{idx: 0, t: 0, playing: {json.dumps(autoplay)}}};
+try {{ const saved = key && JSON.parse(window.localStorage.getItem(key)); if (saved) state = saved; }} catch (e) {{}}
+function save() {{
+  if (key) {{ try {{ window.localStorage.setItem(key, JSON.stringify(state)); }} catch (e) {{}} }}
+}}
+function load(i, t, play) {{
+  state.idx = i; state.t = t; state.playing = play; save();
+  player.src = srcs[i];
+  player.addEventListener("loadedmetadata", () => {{ player.currentTime = t; }}, {{once: true}});
+  if (play) player.play().catch(() => {{}});
+}}
+player.addEventListener("timeupdate", () => {{ state.t = player.currentTime; save(); }});
+player.addEventListener("play", () => {{ state.playing = true; save(); }});
+player.addEventListener("pause", () => {{ if (!player.ended) {{ state.playing = false; save(); }} }});
+player.addEventListener("ended", () => {{
+  if (state.idx + 1 < srcs.length) load(state.idx + 1, 0, true);
+  else if (done) load(0, 0, false);  // 끝나면 처음으로 (다시 듣기)
+  else {{ state.idx += 1; state.t = 0; save(); }}  // 다음 조각이 도착하면 이어서 재생
+}});
+if (state.idx < srcs.length) load(state.idx, state.t, state.playing);
+else if (done) load(0, 0, false);
+</script>""",
+        height=60,
+    )
+
+
+def play_audio_stream(segments: Iterable[bytes], fmt: str = TTS_FORMAT) -> int:
+    """
+    조각이 도착하는 대로 재생: 첫 조각이 오면 바로 플레이어를 그리고, 이후 조각마다 같은 자리에 다시 그린다.
+    재생 위치는 play_audio_queue의 state_key로 이어진다. 재생한 조각 수 반환.
+    """
+    placeholder = st.empty()
+    state_key = f"tts-queue-{uuid.uuid4().hex}"
+    received: List[bytes] = []
+    for seg in segments:
+        received.append(seg)
+        with placeholder.container():
+            play_audio_queue(received, fmt, state_key=state_key, done=False)
+    if received:
+        with placeholder.container():
+            play_audio_queue(received, fmt, state_key=state_key, done=True)
+    return len(received)
+
+
+# 스트리밍 TTS 조각 합성용 실행기
+_tts_stream_executor = ThreadPoolExecutor(max_workers=TTS_STREAM_WORKERS, thread_name_prefix="tts-stream")
+
 
 class VoiceManager:
     def __init__(self):
         api_key = os.getenv("OPENAI_API_KEY")
         self.openai_client = OpenAI(api_key=api_key) if api_key else None
 
-    def text_to_speech(self, text: str, lang: str = 'en') -> bytes:
-        """텍스트를 음성(mp3)으로 변환 (OpenAI TTS API)"""
+    def synthesize(self, text: str, voice: str = TTS_VOICE) -> Optional[bytes]:
+        """
+        캐시 → OpenAI TTS 순으로 mp3를 얻는다.
+        Streamlit 호출 없이 예외를 그대로 올리므로 백그라운드 스레드에서도 사용 가능.
+        API 키가 없고 캐시에도 없으면 None.
+        """
+        key = tts_cache.make_key(text, voice, TTS_MODEL, TTS_FORMAT)
+        cached = tts_cache.get(key)
+        if cached is not None:
+            return cached
         if not self.openai_client:
-            st.warning("⚠️ OpenAI API 키가 없어 TTS 사용 불가")
             return None
+        resp = self.openai_client.audio.speech.create(
+            model=TTS_MODEL,
+            input=text,
+            voice=voice,
+            response_format=TTS_FORMAT
+        )
+        tts_cache.put(key, resp.content)
+        return resp.content
+
+    def stream_text_to_speech(self, text: str, voice: str = TTS_VOICE) -> Iterator[bytes]:
+        """
+        긴 텍스트를 문장 단위 조각으로 나눠 동시에 합성하고, 순서대로 하나씩 내보낸다.
+        첫 조각은 한 문장이고 호출 스레드에서 바로 합성하므로, 첫 오디오까지의 시간은 문장 하나 합성 시간 수준.
+        """
+        segments = split_tts_segments(text)
+        if not segments:
+            return
+        # 나머지 조각은 풀에서 미리 합성하고, 첫 조각은 풀이 붐벼도 기다리지 않게 호출 스레드에서 바로 합성
+        futures = [_tts_stream_executor.submit(self.synthesize, seg, voice) for seg in segments[1:]]
+        produced = False
+        first = self.synthesize(segments[0], voice)
+        if first:
+            produced = True
+            yield first
+        for future in futures:
+            audio = future.result()
+            if audio:
+                produced = True
+                yield audio
+        if segments and not produced and not self.openai_client:
+            st.warning("⚠️ OpenAI API 키가 없어 TTS 사용 불가")
+
+    def text_to_speech(self, text: str, lang: str = 'en', voice: str = TTS_VOICE) -> bytes:
+        """텍스트를 음성(mp3)으로 변환 (OpenAI TTS API, 캐시 우선)"""
         try:
-            resp = self.openai_client.audio.speech.create(
-                model="tts-1",
-                input=text,
-                voice="alloy",  # 선택: alloy, echo, fable, onyx, nova, shimmer
-                response_format="mp3"
-            )
-            return resp.content
+            audio = self.synthesize(text, voice)
         except Exception as e:
             st.error(f"TTS 오류: {e}")
             return None
+        if audio is None:
+            st.warning("⚠️ OpenAI API 키가 없어 TTS 사용 불가")
+        return audio
+
+    def transcribe(self, audio_bytes: bytes) -> str:
+        """
+        Whisper 호출 (오디오 해시 기준 메모 캐시 + 동일 오디오 동시 요청은 한 번만 실행).
+        Streamlit 호출 없이 예외를 그대로 올린다.
+        """
+        key = stt_cache.make_key(audio_bytes, STT_MODEL, STT_LANGUAGE)
+        return stt_cache.get_or_compute(key, lambda: self._whisper(audio_bytes))
+
+    def _whisper(self, audio_bytes: bytes) -> str:
+        upload = preprocess_for_stt(audio_bytes) if STT_PREPROCESS else audio_bytes
+        started = time.monotonic()
+        chunks = split_wav_for_stt(upload)
+        if len(chunks) > 1:
+            # 긴 답변: 무음 지점에서 나눈 조각을 동시에 전사한 뒤 겹친 부분을 제거해 이어 붙임
+            texts = list(_stt_chunk_executor.map(self._whisper_request, chunks))
+            text = stitch_transcripts(texts)
+        else:
+            text = self._whisper_request(upload)
+        stt_metrics.record(len(audio_bytes), len(upload), time.monotonic() - started)
+        return text
+
+    def _whisper_request(self, upload: bytes) -> str:
+        audio_file = io.BytesIO(upload)
+        audio_file.name = "input.wav"  # 확장자 필수
+        transcript = self.openai_client.audio.transcriptions.create(
+            model=STT_MODEL,
+            file=audio_file,
+            language=STT_LANGUAGE
+        )
+        return transcript.text.strip()
 
     def speech_to_text(self, audio_bytes: bytes) -> str:
         """음성을 텍스트로 변환 (OpenAI Whisper API, BytesIO 기반)"""
@@ -39,22 +577,242 @@ class VoiceManager:
             st.warning("⚠️ OpenAI API 키가 없어 STT 사용 불가")
             return "[Voice recording - STT unavailable]"
         try:
-            audio_file = io.BytesIO(audio_bytes)
-            audio_file.name = "input.wav"  # 확장자 필수
-            transcript = self.openai_client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                language="en"
-            )
-            return transcript.text.strip()
+            return self.transcribe(audio_bytes)
         except Exception as e:
             st.error(f"STT 오류: {e}")
             return f"[Voice recording - STT error: {e}]"
 
 
+class TTSPrefetchMetrics:
+    """프로세스 전체 TTS 미리 합성 통계 (문항을 처음 열었을 때 준비돼 있었는지)."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.synthesized = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def record_access(self, ready: bool) -> None:
+        with self._lock:
+            if ready:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def record_result(self, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self.synthesized += 1
+            else:
+                self.failed += 1
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            served = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / served if served else 0.0,
+                "synthesized": self.synthesized,
+                "failed": self.failed,
+                "queued": len(_tts_prefetch_heap),
+            }
+
+
+tts_prefetch_metrics = TTSPrefetchMetrics()
+
+# 모든 세션이 공유하는 미리 합성 풀: 작업 하나 = 힙에서 가장 급한 항목 하나 처리
+# 우선순위 (긴급도, 문항 번호, 순번): 지금 열린 문항(0) → 모든 시험의 앞 문항부터(1)
+_tts_prefetch_executor = ThreadPoolExecutor(max_workers=TTS_PREFETCH_WORKERS, thread_name_prefix="tts-prefetch")
+_tts_prefetch_heap: List[Tuple[int, int, int, "TTSPrefetcher"]] = []
+_tts_prefetch_lock = threading.Lock()
+_tts_prefetch_seq = itertools.count()
+
+
+def _tts_prefetch_push(urgency: int, prefetcher: "TTSPrefetcher", idx: int) -> None:
+    with _tts_prefetch_lock:
+        heapq.heappush(_tts_prefetch_heap, (urgency, idx, next(_tts_prefetch_seq), prefetcher))
+    _tts_prefetch_executor.submit(_tts_prefetch_run_next)
+
+
+def _tts_prefetch_run_next() -> None:
+    with _tts_prefetch_lock:
+        if not _tts_prefetch_heap:
+            return
+        _, idx, _, prefetcher = heapq.heappop(_tts_prefetch_heap)
+    prefetcher._synthesize(idx)
+
+
+class TTSPrefetcher:
+    """
+    시험 문항 전체의 TTS를 공용 풀(_tts_prefetch_executor)에서 미리 합성한다.
+    - 모든 시험의 앞 문항부터 처리하고, 아직 시작 안 된 문항을 요청하면 맨 앞으로 당김
+    - get()은 준비된 오디오를 바로 반환(hit)하거나 해당 문항만 기다림(miss)
+    """
+
+    def __init__(self, texts: List[str], voice: str = TTS_VOICE):
+        self.texts = list(texts)
+        self.voice = voice
+        self.hits = 0
+        self.misses = 0
+        self._results: Dict[int, Optional[bytes]] = {}
+        self._events = [threading.Event() for _ in self.texts]
+        self._started = set()
+        self._served = set()
+        self._lock = threading.Lock()
+        for idx in range(len(self.texts)):
+            _tts_prefetch_push(1, self, idx)
+
+    def __lt__(self, other: "TTSPrefetcher") -> bool:
+        return id(self) < id(other)  # 힙 비교용 (순번이 같을 일은 없음)
+
+    def _synthesize(self, idx: int) -> None:
+        with self._lock:
+            if idx in self._started:
+                return
+            self._started.add(idx)
+        try:
+            audio = VoiceManager().synthesize(self.texts[idx], self.voice)
+        except Exception as e:
+            print(f"[tts-prefetch] Q{idx + 1} 합성 실패: {e}")
+            audio = None
+        tts_prefetch_metrics.record_result(audio is not None)
+        self._results[idx] = audio
+        self._events[idx].set()
+
+    def get(self, idx: int, timeout: Optional[float] = TTS_PREFETCH_WAIT) -> Optional[bytes]:
+        """idx 문항 오디오. 실패/시간 초과면 None (호출 측에서 동기 합성으로 대체)."""
+        if not 0 <= idx < len(self.texts):
+            return None
+        ready = self._events[idx].is_set()
+        with self._lock:
+            first = idx not in self._served
+            if first:
+                self._served.add(idx)
+                if ready:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+        if first:
+            tts_prefetch_metrics.record_access(ready)
+        if not ready:
+            _tts_prefetch_push(0, self, idx)  # 아직 대기 중이면 우선 처리
+            self._events[idx].wait(timeout)
+        return self._results.get(idx)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "ready": sum(1 for e in self._events if e.is_set()),
+            "total": len(self.texts),
+        }
+
+
+def get_tts_prefetcher(questions: List[str]) -> TTSPrefetcher:
+    """세션의 시험 문항에 대한 TTSPrefetcher (문항이 바뀌면 새로 시작)."""
+    prefetcher = st.session_state.get("tts_prefetcher")
+    if prefetcher is None or prefetcher.texts != list(questions):
+        prefetcher = TTSPrefetcher(questions)
+        st.session_state["tts_prefetcher"] = prefetcher
+    return prefetcher
+
+
+# ---------------------- 백그라운드 전사 작업 ---------------------- #
+# 프로세스 전역 실행기 + 작업 레지스트리 (세션에는 job id만 저장)
+_stt_executor = ThreadPoolExecutor(max_workers=STT_WORKERS, thread_name_prefix="stt")
+_stt_jobs: "OrderedDict[str, Future]" = OrderedDict()
+_stt_jobs_lock = threading.Lock()
+
+
+def submit_transcription(audio_bytes: bytes) -> Optional[str]:
+    """전사 작업을 제출하고 job id 반환 (API 키가 없으면 None)."""
+    voice_manager = VoiceManager()
+    if not voice_manager.openai_client:
+        return None
+    job_id = uuid.uuid4().hex
+    future = _stt_executor.submit(voice_manager.transcribe, audio_bytes)
+    with _stt_jobs_lock:
+        _stt_jobs[job_id] = future
+        while len(_stt_jobs) > STT_MAX_JOBS:
+            _stt_jobs.popitem(last=False)
+    return job_id
+
+
+def poll_transcription(job_id: str, timeout: Optional[float] = 0) -> Tuple[str, Optional[str]]:
+    """
+    작업 상태 확인. ("pending", None) / ("done", text) / ("error", 메시지)
+    timeout이 0이 아니면 그 시간만큼 완료를 기다린다.
+    """
+    with _stt_jobs_lock:
+        future = _stt_jobs.get(job_id)
+    if future is None:
+        return "error", "unknown job"
+    if not future.done() and timeout != 0:
+        try:
+            future.exception(timeout=timeout)
+        except Exception:
+            pass
+    if not future.done():
+        return "pending", None
+    if future.exception() is not None:
+        return "error", str(future.exception())
+    return "done", future.result()
+
+
+def resolve_pending_transcriptions(wait: Optional[float] = 0) -> int:
+    """
+    답변 없이 다음 문항으로 넘어간 사이 끝난 전사 결과를 exam_answers에 채운다.
+    남은 작업 수 반환. wait가 주어지면 작업마다 그 시간까지 기다린다.
+    """
+    pending = st.session_state.get("pending_stt", {})
+    answers = st.session_state.get("exam_answers", [])
+    for pos, job_id in list(pending.items()):
+        status, text = poll_transcription(job_id, timeout=wait)
+        if status == "pending":
+            continue
+        pending.pop(pos)
+        if status == "done" and text and pos < len(answers):
+            answers[pos] = text
+    return len(pending)
+
+
+@st.fragment(run_every=STT_POLL_INTERVAL)
+def _stt_job_status(question_idx: int) -> None:
+    """
+    전사 작업 폴링: 진행 중이면 안내만, 끝나면 결과(답변 또는 stt_error_<idx>)를 남기고 전체 재실행.
+    진행 중인 작업이 있을 때만 호출되므로 재실행 후에는 폴링이 멈춘다.
+    """
+    job_key = f"stt_job_{question_idx}"
+    job_id = st.session_state.get(job_key)
+    if not job_id:
+        return
+    status, text = poll_transcription(job_id)
+    if status == "pending":
+        st.info("🔄 음성을 텍스트로 변환 중... (다음 문항으로 넘어가도 괜찮아요)")
+        return
+    st.session_state[job_key] = None  # 같은 녹음은 다시 제출하지 않음
+    if status == "done" and text:
+        st.session_state[f"ans_{question_idx}"] = text
+        st.session_state[f"stt_done_{question_idx}"] = True
+    else:
+        st.session_state[f"stt_error_{question_idx}"] = text or "빈 전사 결과"
+    st.rerun()
+
+
+def _start_transcription(question_idx: int, audio_bytes: bytes) -> None:
+    """녹음 전사를 제출하고 이전 실패 기록을 지운다."""
+    st.session_state.pop(f"stt_error_{question_idx}", None)
+    job_id = submit_transcription(audio_bytes)
+    if job_id:
+        st.session_state[f"stt_job_{question_idx}"] = job_id
+    else:
+        st.warning("⚠️ OpenAI API 키가 없어 STT 사용 불가")
+
+
 def unified_answer_input(question_idx: int, question_text: str) -> str:
     """통합된 답변 입력 UI (음성 + 텍스트)"""
-    voice_manager = VoiceManager()
     answer_key = f"ans_{question_idx}"
     current_answer = st.session_state.get(answer_key, "")
 
@@ -77,19 +835,23 @@ def unified_answer_input(question_idx: int, question_text: str) -> str:
             key=f"audio_input_{question_idx}"
         )
 
+        job_key = f"stt_job_{question_idx}"
         if audio_value is not None and not st.session_state.get(stt_flag_key):
             st.success("🎵 음성이 녹음되었습니다!")
-            st.session_state[audio_data_key] = audio_value.getvalue()
+            audio_bytes = audio_value.getvalue()
             st.audio(audio_value, format="audio/wav")
-            with st.spinner("🔄 음성을 텍스트로 변환 중..."):
-                transcript = voice_manager.speech_to_text(audio_value.getvalue())
-            if transcript and not transcript.startswith("[Voice recording"):
-                final_answer = transcript
-                st.session_state[answer_key] = final_answer
-                st.session_state[stt_flag_key] = True
-                st.rerun()
-            else:
-                st.error("⚠️ 음성 변환 실패. 다시 시도하세요.")
+            # 새 녹음이면 백그라운드 전사 제출 (화면은 막지 않고 폴링으로 결과 반영)
+            if st.session_state.get(audio_data_key) != audio_bytes or job_key not in st.session_state:
+                st.session_state[audio_data_key] = audio_bytes
+                _start_transcription(question_idx, audio_bytes)
+            if st.session_state.get(job_key):
+                _stt_job_status(question_idx)
+            error = st.session_state.get(f"stt_error_{question_idx}")
+            if error:
+                st.error(f"⚠️ 음성 변환 실패: {error}")
+                if st.button("🔁 다시 변환", key=f"stt_retry_{question_idx}"):
+                    _start_transcription(question_idx, audio_bytes)
+                    st.rerun()
         elif audio_value is None and st.session_state.get(stt_flag_key):
             st.session_state[stt_flag_key] = False
 
@@ -144,3 +906,20 @@ def display_tts_button(text, message_index=0):
             audio_data = voice_manager.text_to_speech(text)
             if audio_data:
                 st.audio(audio_data, format="audio/mp3")
+
+
+def render_voice_metrics() -> None:
+    """STT 업로드 절감/지연, TTS 미리 합성 적중률을 사이드바에 표시 (OPIC_SHOW_METRICS=1일 때만)."""
+    if not VOICE_METRICS_PANEL:
+        return
+    stt = stt_metrics.summary()
+    tts = tts_prefetch_metrics.summary()
+    with st.sidebar.expander("🔧 음성 처리 통계", expanded=False):
+        st.markdown(
+            f"**STT** {stt['requests']}건 · 업로드 {stt['bytes_in']:,} → {stt['bytes_out']:,} bytes "
+            f"({stt['bytes_saved_ratio']:.0%} 절감) · 평균 {stt['avg_latency_s']:.2f}초"
+        )
+        st.markdown(
+            f"**TTS 미리 합성** 적중 {tts['hits']} / 대기 {tts['misses']} ({tts['hit_rate']:.0%}) · "
+            f"합성 {tts['synthesized']} · 실패 {tts['failed']} · 대기열 {tts['queued']}"
+        )
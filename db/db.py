@@ -1,6 +1,9 @@
 import os
 import json
-from pymongo import MongoClient
+import time
+import threading
+from typing import Dict, Optional
+from pymongo import MongoClient, ASCENDING, UpdateOne
 from dotenv import load_dotenv
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -17,36 +20,349 @@ if not MONGO_URI:
         "MONGO_URI 환경변수가 비어 있습니다. 루트의 .env 파일 또는 OS 환경변수를 설정하세요."
     )
 
-def connect_db(collection_name):
+# 커넥션 풀 / 타임아웃 / 헬스체크 설정 (환경변수로 조정 가능)
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+# 마지막 ping 이후 이 시간(초)이 지나야 다시 ping (매 호출마다 왕복하지 않도록)
+MONGO_HEALTHCHECK_INTERVAL = float(os.getenv("MONGO_HEALTHCHECK_INTERVAL", "30"))
+
+# 컬렉션별 인덱스 정의: (category, topic_key) 정확 일치 조회용 복합 유니크 인덱스
+INDEX_SPECS = {
+    "opic_samples": [
+        {"keys": [("category", ASCENDING), ("topic_key", ASCENDING)],
+         "name": "category_topic_key", "unique": True},
+    ],
+}
+
+# 프로세스 전역 클라이언트 레지스트리: uri -> MongoClient (MongoClient는 스레드 안전)
+_clients: Dict[str, MongoClient] = {}
+_last_healthcheck: Dict[str, float] = {}
+_clients_lock = threading.Lock()
+_indexed_collections = set()
+
+
+def normalize_topic_key(topic: str) -> str:
+    """토픽 조회용 정규화 키 (앞뒤 공백 제거 + 소문자)."""
+    return str(topic).strip().lower()
+
+
+def get_client(uri: Optional[str] = None) -> MongoClient:
+    """
+    uri별로 하나의 MongoClient를 지연 생성해 재사용한다.
+    - 최초 생성 시와 MONGO_HEALTHCHECK_INTERVAL이 지난 뒤에만 ping
+    - ping 실패 시 레지스트리에서 제거하고 예외를 그대로 올린다
+    """
+    uri = uri or MONGO_URI
+    with _clients_lock:
+        client = _clients.get(uri)
+        created = client is None
+        if created:
+            client = MongoClient(
+                uri,
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                minPoolSize=MONGO_MIN_POOL_SIZE,
+                connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+                serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            )
+            _clients[uri] = client
+            _last_healthcheck[uri] = 0.0
+
+    now = time.monotonic()
+    if created or now - _last_healthcheck.get(uri, 0.0) >= MONGO_HEALTHCHECK_INTERVAL:
+        try:
+            client.admin.command("ping")  # 연결 확인
+        except Exception:
+            _drop_client(uri)
+            raise
+        _last_healthcheck[uri] = now
+        if created:
+            print(f"MongoDB 클라이언트 생성 (maxPoolSize={MONGO_MAX_POOL_SIZE})")
+    return client
+
+
+def _drop_client(uri: str) -> None:
+    with _clients_lock:
+        client = _clients.pop(uri, None)
+        _last_healthcheck.pop(uri, None)
+    if client is not None:
+        client.close()
+
+
+def close_clients() -> None:
+    """레지스트리의 모든 클라이언트를 닫는다 (종료/테스트용)."""
+    for uri in list(_clients.keys()):
+        _drop_client(uri)
+
+
+def connect_db(collection_name, uri=None):
     try:
-        client = MongoClient(MONGO_URI)
-        client.server_info()  # 연결 확인
+        client = get_client(uri)
         db = client[DB_NAME]
         collection = db[collection_name]
-        print(f"MongoDB 연결 성공 (컬렉션: {collection_name})")
-        return collection
     except Exception as e:
         print(f"MongoDB 연결 실패: {e.__class__.__name__} - {e}")
         return None
+    if _index_key(collection) not in _indexed_collections:
+        ensure_indexes(collection)
+    return collection
 
-def upload_contents(json_path, collection_name, overwrite=True, uri=None):
-    col = connect_db(collection_name)
+
+def _index_key(collection):
+    return (id(collection.database.client), collection.full_name)
+
+
+def ensure_indexes(collection) -> bool:
+    """
+    INDEX_SPECS에 정의된 인덱스를 생성한다 (이미 있으면 no-op).
+    프로세스당 컬렉션별 한 번만 시도하며, 기존 데이터에 topic_key가 없어
+    유니크 인덱스 생성이 실패하면 migrate_topic_keys 실행을 안내한다.
+    """
+    _indexed_collections.add(_index_key(collection))
+    ok = True
+    for spec in INDEX_SPECS.get(collection.name, []):
+        try:
+            collection.create_index(spec["keys"], name=spec["name"], unique=spec.get("unique", False))
+        except Exception as e:
+            ok = False
+            print(f"인덱스 생성 실패 ({collection.name}.{spec['name']}): {e.__class__.__name__} - {e}")
+            print("기존 컬렉션이라면 migrate_topic_keys()로 topic_key를 채운 뒤 다시 시도하세요.")
+    return ok
+
+
+def migrate_topic_keys(collection_name, uri=None, batch_size=500):
+    """
+    기존 문서에 topic_key를 채우고 인덱스를 다시 만든다.
+    정규화 후 (category, topic_key)가 겹치는 문서는 수정하지 않고 목록만 출력한다.
+    """
+    col = connect_db(collection_name, uri)
     if col is None:
+        return 0
+
+    seen = {}
+    duplicates = []
+    ops = []
+    updated = 0
+    for doc in col.find({}, {"_id": 1, "category": 1, "topic": 1, "topic_key": 1}):
+        key = normalize_topic_key(doc.get("topic", ""))
+        pair = (doc.get("category"), key)
+        if pair in seen:
+            duplicates.append((seen[pair], doc["_id"], pair))
+            continue
+        seen[pair] = doc["_id"]
+        if doc.get("topic_key") != key:
+            ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"topic_key": key}}))
+        if len(ops) >= batch_size:
+            updated += col.bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        updated += col.bulk_write(ops, ordered=False).modified_count
+
+    for first_id, dup_id, pair in duplicates:
+        print(f"중복 토픽 {pair}: {first_id} / {dup_id} (수동 정리 필요)")
+    print(f"topic_key 마이그레이션: {updated}개 문서 갱신 ({DB_NAME}.{collection_name})")
+
+    ensure_indexes(col)
+    return updated
+
+
+# ---------------------- 시드 데이터 스트리밍 적재 ---------------------- #
+SEED_META_COLLECTION = "opic_meta"
+SEED_CHUNK_SIZE = int(os.getenv("SEED_CHUNK_SIZE", "500"))
+_READ_CHUNK = 64 * 1024
+
+
+class _JsonStream:
+    """파일을 조각 단위로 읽으며 JSON 토큰/값을 하나씩 꺼내는 최소 리더."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(_READ_CHUNK)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _skip_ws(self) -> None:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf) or not self._fill():
+                return
+
+    def consume_if(self, ch: str) -> bool:
+        self._skip_ws()
+        if self.buf[self.pos:self.pos + 1] == ch:
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, ch: str) -> None:
+        if not self.consume_if(ch):
+            raise ValueError(f"JSON 형식 오류: '{ch}' 필요 (위치 근처: {self.buf[self.pos:self.pos + 20]!r})")
+
+    def read_value(self):
+        self._skip_ws()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                self.pos = end
+                return value
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+
+
+def _iter_nested_json(f):
+    """{category: {topic: [prompts]}} 형식을 토픽 단위로 하나씩 읽는다."""
+    r = _JsonStream(f)
+    r.expect("{")
+    if r.consume_if("}"):
         return
-    with open(json_path, 'r', encoding='utf-8') as f:
-        raw = json.load(f)
-
-    docs = []
-    for category, topics in raw.items():
-        for topic, prompts in topics.items():
-            docs.append({
-                "category": category,
-                "topic": topic,
-                "content": prompts
-            })
-
-    if overwrite:
-        col.delete_many({})
-
-    result = col.insert_many(docs)
-    print(f"Inserted {len(result.inserted_ids)} documents into {DB_NAME}.{collection_name}")
+    while True:
+        category = r.read_value()
+        r.expect(":")
+        r.expect("{")
+        if not r.consume_if("}"):
+            while True:
+                topic = r.read_value()
+                r.expect(":")
+                yield {"category": category, "topic": topic, "content": r.read_value()}
+                if r.consume_if(","):
+                    continue
+                r.expect("}")
+                break
+        if r.consume_if(","):
+            continue
+        r.expect("}")
+        return
+
+
+def iter_seed_records(path):
+    """
+    시드 파일을 레코드 단위로 스트리밍한다 (메모리 사용량은 레코드 하나 수준).
+    - .jsonl: 한 줄에 {"category", "topic", "content"} 하나
+    - .json : {category: {topic: [prompts]}} (기존 seed 형식)
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        else:
+            yield from _iter_nested_json(f)
+
+
+def _load_checkpoint(checkpoint_path):
+    try:
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _save_checkpoint(checkpoint_path, state):
+    tmp = checkpoint_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, checkpoint_path)
+
+
+def get_seed_version(collection_name, uri=None):
+    """마지막으로 완료된 시드 실행 id (QuestionBank 버전 스탬프용). 없으면 None."""
+    meta = connect_db(SEED_META_COLLECTION, uri)
+    if meta is None:
+        return None
+    doc = meta.find_one({"_id": collection_name}, {"version": 1})
+    return doc.get("version") if doc else None
+
+
+def seed_contents(path, collection_name, uri=None, prune=True, chunk_size=SEED_CHUNK_SIZE,
+                  checkpoint_path=None, resume=True):
+    """
+    시드 파일을 (category, topic_key) 기준 upsert로 청크 단위 bulk_write 한다.
+    - 기존 문서는 교체될 때까지 그대로 남아 있어 읽기 중단이 없다.
+    - 청크마다 체크포인트를 남겨, 중단 후 다시 실행하면 이어서 진행한다.
+    - prune=True면 이번 실행에서 보지 못한 문서를 마지막에 삭제한다.
+    - 완료 시 opic_meta에 버전 스탬프를 기록한다.
+    """
+    col = connect_db(collection_name, uri)
+    if col is None:
+        return 0
+
+    checkpoint_path = checkpoint_path or f"{path}.{collection_name}.checkpoint"
+    state = _load_checkpoint(checkpoint_path) if resume else None
+    if not state:
+        state = {"run_id": f"{int(time.time())}-{os.getpid()}", "done": 0}
+    run_id, skip = state["run_id"], state["done"]
+    if skip:
+        print(f"체크포인트에서 재개: {skip}개 레코드 건너뜀 (run_id={run_id})")
+
+    started = time.monotonic()
+    done = skip
+    upserted = modified = 0
+    ops = []
+
+    def _flush():
+        nonlocal upserted, modified, ops
+        if not ops:
+            return
+        result = col.bulk_write(ops, ordered=False)
+        upserted += result.upserted_count
+        modified += result.modified_count
+        ops = []
+        state["done"] = done
+        _save_checkpoint(checkpoint_path, state)
+        elapsed = max(time.monotonic() - started, 1e-9)
+        print(f"  진행: {done}개 레코드 ({(done - skip) / elapsed:.0f} rec/s)")
+
+    for n, record in enumerate(iter_seed_records(path)):
+        if n < skip:
+            continue
+        topic = record["topic"]
+        key = {"category": record["category"], "topic_key": normalize_topic_key(topic)}
+        ops.append(UpdateOne(key, {"$set": {
+            **key,
+            "topic": topic,
+            "content": record.get("content", []),
+            "seed_run": run_id,
+        }}, upsert=True))
+        done = n + 1
+        if len(ops) >= chunk_size:
+            _flush()
+    _flush()
+
+    removed = 0
+    if prune:
+        removed = col.delete_many({"seed_run": {"$ne": run_id}}).deleted_count
+
+    meta = connect_db(SEED_META_COLLECTION, uri)
+    if meta is not None:
+        meta.update_one({"_id": collection_name},
+                        {"$set": {"version": run_id, "records": done}}, upsert=True)
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    ensure_indexes(col)
+
+    elapsed = max(time.monotonic() - started, 1e-9)
+    print(f"Seeded {done - skip} records into {DB_NAME}.{collection_name} "
+          f"(upserted={upserted}, modified={modified}, removed={removed}, "
+          f"{(done - skip) / elapsed:.0f} rec/s)")
+    return done
+
+
+def upload_contents(json_path, collection_name, overwrite=True, uri=None):
+    """기존 진입점: 스트리밍 upsert 시더로 위임 (overwrite=True면 남는 문서 정리)."""
+    return seed_contents(json_path, collection_name, uri=uri, prune=overwrite)
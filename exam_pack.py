@@ -0,0 +1,167 @@
+# 시험 팩: 완성된 시험을 미리 대량 생성해 두고 즉시 꺼내 쓰기
+"""
+수업처럼 수십 명이 동시에 시험을 시작할 때 실시간 생성 대신 미리 만든 시험을 꺼내 쓴다.
+- build: 설문 프로필 목록(또는 무작위 프로필)으로 N개 시험을 프로세스 풀에서 생성
+- 팩 형식: gzip JSON Lines (1행 헤더, 이후 1행 = 시험 1개 {"topics", "questions"})
+- 앱: OPIC_EXAM_PACK 경로가 설정돼 있으면 create_opic_exam이 설문 토픽과 맞는 시험을 먼저 찾음
+
+실행:
+    python exam_pack.py build --count 100 --workers 4 --out packs/class.jsonl.gz [--profiles profiles.json]
+    python exam_pack.py info packs/class.jsonl.gz
+"""
+import os
+import gzip
+import json
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from quest import (make_questions, _normalize_key, SELF_INTRO_QUESTION,
+                   get_survey_topics_from_data, plan_exam_sections)
+
+PACK_VERSION = 1
+EXAM_PACK_PATH = os.getenv("OPIC_EXAM_PACK", "")
+
+
+# ---------------------- 생성 ---------------------- #
+def build_exam(profile: Dict[str, Any], seed: int) -> Dict[str, Any]:
+    """프로필 하나로 시험 1개 생성 (워커 프로세스에서 실행)."""
+    rng = random.Random(seed)
+    level = profile.get("level", "level_5")
+    sections = plan_exam_sections(profile.get("topics", []), rng)
+
+    questions = [SELF_INTRO_QUESTION]
+    for topic, category, count in sections:
+        questions.extend(make_questions(topic, category, level, count))
+    return {
+        "topics": [topic for topic, category, _ in sections if category == "survey"],
+        "questions": questions,
+    }
+
+
+def _random_profiles(n: int, seed: int) -> List[Dict[str, Any]]:
+    survey_topics = get_survey_topics_from_data()["survey"]
+    rng = random.Random(seed)
+    return [{"topics": rng.sample(survey_topics, rng.randint(3, 12))} for _ in range(n)]
+
+
+def _read_profiles(path: str) -> List[Dict[str, Any]]:
+    """[["movies", "cafe", ...], ...] 또는 [{"topics": [...], "level": "..."}, ...]"""
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    return [p if isinstance(p, dict) else {"topics": list(p)} for p in raw]
+
+
+def build_pack(out_path: str, count: int, profiles: Optional[List[Dict[str, Any]]] = None,
+               workers: int = 4, seed: int = 0) -> int:
+    if count < 1:
+        raise ValueError(f"count는 1 이상이어야 합니다: {count}")
+    profiles = profiles or _random_profiles(count, seed)
+    jobs = [(profiles[i % len(profiles)], seed + i) for i in range(count)]
+
+    started = time.monotonic()
+    written = 0
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as pool, \
+            gzip.open(out_path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"version": PACK_VERSION, "created_at": int(time.time()), "count": count}) + "\n")
+        for exam in pool.map(build_exam, *zip(*jobs)):
+            if len(exam["questions"]) <= 1:
+                continue  # 질문 생성 실패한 시험은 제외
+            f.write(json.dumps(exam, ensure_ascii=False, separators=(",", ":")) + "\n")
+            written += 1
+            if written % 10 == 0:
+                print(f"  {written}/{count} exams ({written / (time.monotonic() - started):.1f}/s)")
+
+    print(f"Wrote {written} exams to {out_path} in {time.monotonic() - started:.1f}s")
+    return written
+
+
+# ---------------------- 로드 / 추첨 ---------------------- #
+class ExamPack:
+    """팩 파일을 메모리에 올려 설문 토픽과 맞는 시험을 즉시 추첨한다."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.exams: List[Dict[str, Any]] = []
+        self._topic_sets: List[frozenset] = []
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline() or "{}")
+            if header.get("version") != PACK_VERSION:
+                raise ValueError(f"지원하지 않는 시험 팩 버전: {header.get('version')}")
+            for line in f:
+                if line.strip():
+                    exam = json.loads(line)
+                    self.exams.append(exam)
+                    self._topic_sets.append(frozenset(_normalize_key(t) for t in exam["topics"]))
+
+    def draw(self, user_topics: List[str], rng=random) -> Optional[List[str]]:
+        """
+        설문 토픽 3개가 모두 사용자가 고른 토픽에 포함된 시험 중 하나를 반환.
+        사용자가 고른 토픽이 3개 미만이면(실시간 생성도 무작위 추첨) 아무 시험이나 반환.
+        """
+        if not self.exams:
+            return None
+        selected = {_normalize_key(t) for t in user_topics if t}
+        if len(selected) < 3:
+            return list(rng.choice(self.exams)["questions"])
+        matches = [i for i, topics in enumerate(self._topic_sets) if topics <= selected]
+        if not matches:
+            return None
+        return list(self.exams[rng.choice(matches)]["questions"])
+
+
+_pack: Optional[ExamPack] = None
+_pack_lock = threading.Lock()
+
+
+def get_exam_pack(path: str = EXAM_PACK_PATH) -> Optional[ExamPack]:
+    """OPIC_EXAM_PACK 팩을 프로세스당 한 번 로드 (설정 안 됐거나 실패하면 None)."""
+    global _pack
+    if not path:
+        return None
+    with _pack_lock:
+        if _pack is None or _pack.path != path:
+            try:
+                _pack = ExamPack(path)
+                print(f"시험 팩 로드: {len(_pack.exams)}개 ({path})")
+            except (OSError, ValueError) as e:
+                print(f"시험 팩 로드 실패: {e}")
+                return None
+    return _pack
+
+
+def draw_exam_from_pack(user_topics: List[str]) -> Optional[List[str]]:
+    pack = get_exam_pack()
+    return pack.draw(user_topics) if pack else None
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="OPIc 시험 팩 생성/확인")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="시험 팩 생성")
+    b.add_argument("--out", required=True, help="출력 경로 (.jsonl.gz)")
+    b.add_argument("--count", type=int, default=100, help="생성할 시험 수")
+    b.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="워커 프로세스 수")
+    b.add_argument("--profiles", help="설문 프로필 JSON (없으면 무작위 프로필)")
+    b.add_argument("--seed", type=int, default=0)
+    i = sub.add_parser("info", help="시험 팩 요약 출력")
+    i.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "build":
+        if args.count < 1:
+            parser.error("--count must be at least 1")
+        profiles = _read_profiles(args.profiles) if args.profiles else None
+        build_pack(args.out, args.count, profiles, args.workers, args.seed)
+    else:
+        pack = ExamPack(args.path)
+        topics = {t for s in pack._topic_sets for t in s}
+        print(f"{args.path}: {len(pack.exams)} exams, {len(topics)} survey topics")
+
+
+if __name__ == "__main__":
+    main()
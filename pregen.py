@@ -0,0 +1,119 @@
+# 질문 사전 생성 워커
+"""
+모든 토픽에 대해 바로 꺼내 쓸 수 있는 LLM 생성 질문을 워밍 풀에 N개씩 유지한다.
+- 시험 생성(make_questions / make_questions_async)이 풀에서 하나씩 소비
+- 워커는 주기적으로 깊이를 확인해 모자란 만큼만 다시 생성 (LLM 호출 속도 제한)
+- 풀/카운터는 QuestionCache의 SQLite 파일에 있어 앱 프로세스와 공유된다
+
+실행:
+    python pregen.py                 # 백그라운드 루프
+    python pregen.py --once          # 한 번만 채우고 종료
+    python pregen.py --status        # 풀 깊이 / 히트·미스 출력
+"""
+import os
+import argparse
+import threading
+from typing import Optional
+
+from quest import (
+    question_bank,
+    question_cache,
+    generate_openai_questions,
+    _build_generation_prompt,
+)
+
+PREGEN_DEPTH = int(os.getenv("PREGEN_DEPTH", "3"))           # 토픽당 준비해 둘 변형 수
+PREGEN_RATE = float(os.getenv("PREGEN_RATE", "1.0"))         # 초당 LLM 호출 상한
+PREGEN_INTERVAL = float(os.getenv("PREGEN_INTERVAL", "30"))  # 채우기 주기(초)
+
+
+class PregenWorker(threading.Thread):
+    """워밍 풀을 목표 깊이로 유지하는 백그라운드 스레드."""
+
+    def __init__(self, depth: int = PREGEN_DEPTH, rate: float = PREGEN_RATE,
+                 interval: float = PREGEN_INTERVAL):
+        super().__init__(name="pregen-worker", daemon=True)
+        self.depth = depth
+        self.rate = rate
+        self.interval = interval
+        self.generated = 0
+        self.failed = 0
+        self._stop_event = threading.Event()
+
+    def refill_once(self) -> int:
+        """모든 토픽을 한 바퀴 돌며 모자란 변형을 생성한다. 생성 개수 반환."""
+        generated = 0
+        for category, topic in question_bank.topics():
+            db_questions = list(question_bank.get(category, topic))
+            prompt = _build_generation_prompt(topic, category, db_questions)
+            missing = self.depth - question_cache.pool_depth(category, topic, prompt)
+            for _ in range(max(0, missing)):
+                if self._stop_event.is_set():
+                    return generated
+                questions = generate_openai_questions(prompt, 3)
+                if questions:
+                    question_cache.add(category, topic, prompt, questions)
+                    question_cache.pool_push(category, topic, prompt, questions)
+                    generated += 1
+                else:
+                    self.failed += 1
+                if self.rate > 0:
+                    self._stop_event.wait(1.0 / self.rate)
+        self.generated += generated
+        return generated
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                n = self.refill_once()
+                if n:
+                    print(f"[pregen] {n}개 변형 생성")
+                    print_status()
+            except Exception as e:
+                print(f"[pregen] 오류: {e.__class__.__name__} - {e}")
+            self._stop_event.wait(self.interval)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop_event.set()
+        self.join(timeout)
+
+
+def print_status(depth: int = PREGEN_DEPTH) -> None:
+    depths = question_cache.pool_depths()
+    topics = question_bank.topics()
+    ready = sum(1 for t in topics if depths.get(t, 0) >= depth)
+    stats = question_cache.stats()
+    hit, miss = stats.get("pool_hit", 0), stats.get("pool_miss", 0)
+    rate = hit / (hit + miss) if hit + miss else 0.0
+    print(f"[pregen] 풀: {sum(depths.values())}개 변형 / 목표 깊이 {depth} 충족 토픽 {ready}/{len(topics)}")
+    print(f"[pregen] 히트 {hit} / 미스 {miss} (히트율 {rate:.0%})")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="OPIc 질문 워밍 풀 사전 생성 워커")
+    parser.add_argument("--depth", type=int, default=PREGEN_DEPTH, help="토픽당 준비해 둘 변형 수")
+    parser.add_argument("--rate", type=float, default=PREGEN_RATE, help="초당 LLM 호출 상한")
+    parser.add_argument("--interval", type=float, default=PREGEN_INTERVAL, help="채우기 주기(초)")
+    parser.add_argument("--once", action="store_true", help="한 번만 채우고 종료")
+    parser.add_argument("--status", action="store_true", help="풀 상태만 출력")
+    args = parser.parse_args(argv)
+
+    if args.status:
+        print_status(args.depth)
+        return
+
+    worker = PregenWorker(args.depth, args.rate, args.interval)
+    if args.once:
+        print(f"[pregen] {worker.refill_once()}개 변형 생성")
+        print_status(args.depth)
+        return
+
+    worker.start()
+    try:
+        worker.join()
+    except KeyboardInterrupt:
+        worker.stop(timeout=5)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,37 @@
 import os
 import json
+import time
+import random
+import sqlite3
 import asyncio
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
-from db.db import connect_db
+import hashlib
+import threading
+from contextlib import closing
+from typing import List, Dict, Any, Optional, Tuple
+from openai import OpenAI, AsyncOpenAI
+from db.db import connect_db, normalize_topic_key, get_seed_version
 
 # 서베이랑 질문 topic 매칭위한 파일 경로
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 DEFAULT_MAP_PATH = os.path.join(DATA_DIR, "survey_topic_map.json")
 
 # 오픽 질문 샘플 파일 경로
-OPIC_DATA_PATH = os.path.join(os.path.dirname(__file__), "opic_question.json")
+OPIC_DATA_PATH = os.path.join(DATA_DIR, "opic_question.json")
+
+# 질문 은행 컬렉션 / 버전 확인 주기(초)
+QUESTION_COLLECTION = "opic_samples"
+QUESTION_BANK_TTL = float(os.getenv("QUESTION_BANK_TTL", "300"))
+
+# 질문 생성 모델 / 시험 생성 시 동시 LLM 호출 상한
+QUESTION_MODEL = "gpt-3.5-turbo"
+QUESTION_GEN_CONCURRENCY = int(os.getenv("QUESTION_GEN_CONCURRENCY", "5"))
+
+# 생성 질문 디스크 캐시 (빈 문자열이면 비활성화)
+QUESTION_CACHE_PATH = os.getenv("QUESTION_CACHE_PATH", os.path.join(DATA_DIR, "question_cache.sqlite3"))
+QUESTION_CACHE_TTL = float(os.getenv("QUESTION_CACHE_TTL", str(7 * 24 * 3600)))
+QUESTION_CACHE_POOL_SIZE = int(os.getenv("QUESTION_CACHE_POOL_SIZE", "8"))        # 키당 변형 개수
+QUESTION_CACHE_MAX_ENTRIES = int(os.getenv("QUESTION_CACHE_MAX_ENTRIES", "5000"))  # 전체 변형 상한
+QUESTION_CACHE_REUSE_RATIO = float(os.getenv("QUESTION_CACHE_REUSE_RATIO", "0.8"))  # 재사용 확률
 
 # JSON 파일 로드
 def load_json(path: str) -> Optional[Dict[str, Any]]:
@@ -26,7 +47,8 @@ opic_data = load_json(OPIC_DATA_PATH) or {}
 
 # 서베이 내용(키)을 표준화 함수
 def _normalize_key(s: str) -> str:
-    return s.strip().lower()
+    # DB의 topic_key 필드와 같은 규칙을 써야 정확 일치 조회가 성립
+    return normalize_topic_key(s)
 
 
 # 설문조사 항목과 DB 토픽 매핑 로드
@@ -41,60 +63,437 @@ def load_survey_map(map_path: str = DEFAULT_MAP_PATH) -> Dict[str, str]:
     return {str(k): str(v) for k, v in obj.items()}
 
 
-# MongoDB에서 서베이 질문 가져오기
-def get_questions_from_db(survey_topic: str) -> List[str]:
-    # connect_db is a synchronous function, so await is not needed.
-    db_collection = connect_db('opic_samples')
+# 시험 첫 문항 (자기소개)
+SELF_INTRO_QUESTION = "Tell me about yourself."
 
-    if db_collection is None:
-        return []
 
-    normalized_topic = _normalize_key(survey_topic)
+# 시험에 쓰는 전체 토픽 표 (설문 / 롤플레이 / 돌발)
+def get_survey_topics_from_data() -> Dict[str, List[str]]:
+    """
+    Extracts all possible survey topics to be used for the exam.
+    (feature/opic-questions 분기에서 쓰던 기본 구조 유지)
+    """
+    topic_structure = {
+        "survey": [
+            "have work experience", "living alone in a house/apartment", "living with friends in a house/apartment",
+            "living with family in a house/apartment", "dormitory", "military barracks", "student",
+            "museum", "watching sports", "TV", "watching cooking programs", "driving", "club", "park",
+            "Improving living space", "texting friends", "watching reality shows", "spa/massage shop",
+            "camping", "performance", "bar/pub", "billiard", "test preparation", "news", "shopping",
+            "beach", "volunteering", "chess", "cafe", "SNS", "movies", "game", "concert", "health",
+            "searching job", "reading books to children", "music", "musical instruments", "dancing",
+            "writing", "drawing", "cooking", "pets", "reading", "investing", "travel magazine", "singing",
+            "basketball", "baseball/softball", "soccer", "american football", "hockey", "cricket",
+            "golf", "volleyball", "tennis", "badminton", "table tennis", "swimming", "bicycling",
+            "skiing/snowboarding", "ice skating", "jogging", "walking", "yoga", "hiking/trekking",
+            "fishing", "taekwondo", "taking fitness classes", "do not exercise",
+            "domestic business trip", "overseas business trip", "staycation", "domestic travel",
+            "international travel", "newspaper", "taking photos"
+        ],
+        "role_play": [
+            "Getting Ready for Traveling", "Cancelling Appointment", "Item Purchase"
+        ],
+        "random_question": [
+            "technology", "industry", "recycling", "weather"
+        ]
+    }
+    return topic_structure
+
+
+# 시험 섹션 구성
+def plan_exam_sections(user_topics: List[str], rng=random) -> List[Tuple[str, str, int]]:
+    """
+    설문 토픽으로 시험 섹션 구성을 정한다 (Streamlit 상태와 무관, exam.py / exam_pack.py 공용).
+    2-10: 설문 토픽 3개 x 3문항 (선택 토픽이 3개 미만이면 전체 토픽에서 추첨)
+    11-13: 롤플레이 3문항
+    14-15: 랜덤 2문항
+    """
+    topic_structure = get_survey_topics_from_data()
 
-    # Use find_one to query the database for the topic.
-    # We are assuming the documents are structured with 'topic' as a field.
-    document = db_collection.find_one({"topic": normalized_topic, "category": "survey"})
+    # 2-10. Survey topics (3 topics x 3 questions)
+    unique_topics = sorted({t for t in user_topics if t})
+    if len(unique_topics) >= 3:
+        topics_for_exam = rng.sample(unique_topics, 3)
+    else:
+        topics_for_exam = rng.sample(topic_structure["survey"], 3)
 
-    if document:
-        # The questions are stored in a key called 'content' within the document.
-        return document.get("content", [])
+    # 11-13. Role-play (3 questions)
+    role_play_topic = rng.choice(topic_structure["role_play"])
 
-    return []
+    # 14-15. Random (2 questions)
+    random_topic = rng.choice(topic_structure["random_question"])
+
+    sections = [(topic, 'survey', 3) for topic in topics_for_exam]
+    sections.append((role_play_topic, 'role_play', 3))
+    sections.append((random_topic, 'random_question', 2))
+    return sections
+
+
+# 프로세스 단위 인메모리 질문 은행
+class QuestionBank:
+    """
+    opic_samples 컬렉션을 프로세스당 한 번 통째로 읽어
+    (category, normalized_topic) -> tuple[str, ...] 인덱스로 O(1) 조회를 제공한다.
+    - DB에 연결할 수 없으면 번들 JSON(opic_question.json)으로 채운다.
+    - TTL이 지나면 시드 버전 스탬프와 문서 수만 확인하고, 바뀐 경우에만 다시 적재한다.
+    """
+
+    def __init__(self, collection_name: str = QUESTION_COLLECTION, ttl: float = QUESTION_BANK_TTL):
+        self.collection_name = collection_name
+        self.ttl = ttl
+        self.source: Optional[str] = None  # "db" | "json"
+        self._index: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+        self._names: Dict[Tuple[str, str], str] = {}  # 인덱스 키 -> 원래 토픽 표기
+        self._version: Optional[Any] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _build_index(docs):
+        index: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+        names: Dict[Tuple[str, str], str] = {}
+        for doc in docs:
+            category, topic = doc.get("category"), doc.get("topic")
+            if not category or not topic:
+                continue
+            key = doc.get("topic_key") or _normalize_key(topic)
+            index[(category, key)] = tuple(doc.get("content") or ())
+            names[(category, key)] = topic
+        return index, names
+
+    @staticmethod
+    def _json_docs(raw: Dict[str, Any]):
+        for category, topics in raw.items():
+            for topic, prompts in topics.items():
+                yield {"category": category, "topic": topic, "content": prompts}
+
+    def _fetch_version(self, col) -> Any:
+        # 시드 실행 id(opic_meta) + 문서 수: 둘 다 같으면 재적재하지 않음
+        return (get_seed_version(self.collection_name), col.estimated_document_count())
+
+    def refresh(self, force: bool = False) -> None:
+        """버전 스탬프가 바뀌었을 때(또는 force) 인덱스를 통째로 교체한다."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self.source is not None and now - self._checked_at < self.ttl:
+                return
+            self._checked_at = now
+
+            col = connect_db(self.collection_name)
+            if col is not None:
+                try:
+                    version = self._fetch_version(col)
+                    if force or self.source != "db" or version != self._version:
+                        docs = col.find({}, {"_id": 0, "category": 1, "topic": 1, "topic_key": 1, "content": 1})
+                        self._index, self._names = self._build_index(docs)
+                        self._version = version
+                        self.source = "db"
+                    return
+                except Exception as e:
+                    print(f"질문 은행 DB 적재 실패: {e.__class__.__name__} - {e}")
+
+            if self.source is None:
+                self._index, self._names = self._build_index(self._json_docs(opic_data))
+                self.source = "json"
+
+    def get(self, category: str, topic: str) -> Tuple[str, ...]:
+        self.refresh()
+        return self._index.get((category, _normalize_key(topic)), ())
+
+    def get_many(self, pairs: List[Tuple[str, str]]) -> Dict[Tuple[str, str], List[str]]:
+        """
+        여러 (category, topic)을 한 번에 조회한다.
+        인덱스에 없는 항목만 모아 DB에 한 번의 쿼리로 요청하고 인덱스에 합친다.
+        """
+        self.refresh()
+        found: Dict[Tuple[str, str], List[str]] = {}
+        misses: List[Tuple[str, str]] = []
+        for category, topic in pairs:
+            content = self._index.get((category, _normalize_key(topic)))
+            if content is None:
+                misses.append((category, topic))
+            else:
+                found[(category, topic)] = list(content)
+
+        if misses:
+            # 없는 토픽도 빈 튜플로 기록해 다음 버전 변경 전까지 재조회하지 않음
+            fetched = get_questions_bulk_from_db(misses)
+            for category, topic in misses:
+                content = fetched.get((category, topic), [])
+                self._index[(category, _normalize_key(topic))] = tuple(content)
+                found[(category, topic)] = list(content)
+        return found
+
+    def topics(self) -> List[Tuple[str, str]]:
+        """예시 질문이 있는 모든 (category, topic) 목록 (원래 표기)."""
+        self.refresh()
+        return [(category, self._names[(category, key)])
+                for (category, key), content in self._index.items()
+                if content and (category, key) in self._names]
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+question_bank = QuestionBank()
+
+
+# (category, topic_key) 복합 인덱스로 정확 일치 조회
+def _find_topic_content(category: str, topic: str) -> List[str]:
+    db_collection = connect_db(QUESTION_COLLECTION)
 
-# MongoDB에서 롤플레이 질문 가져오기
-def get_role_play_questions_from_db(role_play_topic: str) -> List[str]:
-    db_collection = connect_db('opic_samples')
     if db_collection is None:
         return []
 
-    # 대소문자 구분 없이 검색
-    document = db_collection.find_one({
-        "topic": {"$regex": f"^{role_play_topic}$", "$options": "i"},
-        "category": "role_play"
-    })
+    document = db_collection.find_one(
+        {"category": category, "topic_key": _normalize_key(topic)},
+        {"_id": 0, "content": 1},
+    )
 
     if document:
+        # The questions are stored in a key called 'content' within the document.
         return document.get("content", [])
 
     return []
 
 
+# MongoDB에서 서베이 질문 가져오기
+def get_questions_from_db(survey_topic: str) -> List[str]:
+    return _find_topic_content("survey", survey_topic)
+
+# MongoDB에서 롤플레이 질문 가져오기 (topic_key가 정규화돼 있어 대소문자 무관)
+def get_role_play_questions_from_db(role_play_topic: str) -> List[str]:
+    return _find_topic_content("role_play", role_play_topic)
+
+
 # MongoDB에서 돌발질문 가져오기
 def get_random_questions_from_db(random_topic: str) -> List[str]:
-    db_collection = connect_db("opic_samples")
+    return _find_topic_content("random_question", random_topic)
+
+# MongoDB에서 여러 토픽의 질문을 한 번에 가져오기
+def get_questions_bulk_from_db(pairs: List[Tuple[str, str]]) -> Dict[Tuple[str, str], List[str]]:
+    """
+    (category, topic) 목록을 $or/$in 쿼리 한 번으로 조회해
+    {(category, topic): content} 딕셔너리로 반환한다. (projection은 content 중심)
+    """
+    if not pairs:
+        return {}
 
+    db_collection = connect_db(QUESTION_COLLECTION)
     if db_collection is None:
-        return []
+        return {}
 
-    normalized_topic = _normalize_key(random_topic)
+    # 카테고리별로 묶어 (category, topic_key) 인덱스를 타는 $in 조건 생성
+    keys_by_category: Dict[str, set] = {}
+    for category, topic in pairs:
+        keys_by_category.setdefault(category, set()).add(_normalize_key(topic))
+    query = {"$or": [
+        {"category": category, "topic_key": {"$in": sorted(keys)}}
+        for category, keys in keys_by_category.items()
+    ]}
+
+    by_key: Dict[Tuple[str, str], List[str]] = {}
+    for document in db_collection.find(query, {"_id": 0, "category": 1, "topic_key": 1, "content": 1}):
+        by_key[(document["category"], document["topic_key"])] = document.get("content", [])
+
+    return {
+        (category, topic): by_key[(category, _normalize_key(topic))]
+        for category, topic in pairs
+        if (category, _normalize_key(topic)) in by_key
+    }
+
+# LLM 생성 질문 디스크 캐시
+class QuestionCache:
+    """
+    (category, topic, hash(prompt), model) 키마다 생성된 질문 변형 풀을 SQLite에 보관한다.
+    - reuse_ratio 확률로 풀에서 하나를 꺼내 쓰고, 나머지는 새로 생성해 풀에 추가
+    - TTL이 지난 변형은 버리고, 키당 pool_size / 전체 max_entries를 넘으면 LRU로 정리
+    """
 
-    # DB에서 topic과 category를 기준으로 문서 조회
-    document = db_collection.find_one({"topic": normalized_topic, "category": "random_question"})
+    def __init__(self, path: str = QUESTION_CACHE_PATH, ttl: float = QUESTION_CACHE_TTL,
+                 pool_size: int = QUESTION_CACHE_POOL_SIZE, max_entries: int = QUESTION_CACHE_MAX_ENTRIES,
+                 reuse_ratio: float = QUESTION_CACHE_REUSE_RATIO):
+        self.path = path
+        self.ttl = ttl
+        self.pool_size = pool_size
+        self.max_entries = max_entries
+        self.reuse_ratio = reuse_ratio
+        self.hits = 0
+        self.misses = 0
+        self._ready = False
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._ready:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS variants ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, cache_key TEXT NOT NULL,"
+                " category TEXT, topic TEXT, model TEXT, questions TEXT NOT NULL,"
+                " created_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_variants_key ON variants(cache_key)")
+            # 사전 생성 워밍 풀(소비되면 삭제) + 프로세스 간 공유 카운터
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS warm_pool ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, cache_key TEXT NOT NULL,"
+                " category TEXT, topic TEXT, questions TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_warm_pool_key ON warm_pool(cache_key)")
+            conn.execute("CREATE TABLE IF NOT EXISTS pool_stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.commit()
+            self._ready = True
+        return conn
+
+    @staticmethod
+    def make_key(category: str, topic: str, prompt: str, model: str) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return f"{category}|{_normalize_key(topic)}|{model}|{prompt_hash}"
+
+    def choose(self, category: str, topic: str, prompt: str, model: str = QUESTION_MODEL) -> Optional[List[str]]:
+        """재사용할 변형을 고르면 반환, 새로 생성해야 하면 None."""
+        if not self.enabled:
+            return None
+        key = self.make_key(category, topic, prompt, model)
+        now = time.time()
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM variants WHERE cache_key = ? AND created_at < ?", (key, now - self.ttl))
+                rows = conn.execute("SELECT id, questions FROM variants WHERE cache_key = ?", (key,)).fetchall()
+                if rows and random.random() < self.reuse_ratio:
+                    row_id, questions = random.choice(rows)
+                    conn.execute("UPDATE variants SET last_used = ? WHERE id = ?", (now, row_id))
+                    self.hits += 1
+                    return json.loads(questions)
+        except sqlite3.Error as e:
+            print(f"질문 캐시 조회 실패: {e}")
+        self.misses += 1
+        return None
 
-    if document:
-        return document.get("content", [])
+    def add(self, category: str, topic: str, prompt: str, questions: List[str], model: str = QUESTION_MODEL) -> None:
+        if not self.enabled or not questions:
+            return
+        key = self.make_key(category, topic, prompt, model)
+        now = time.time()
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT INTO variants (cache_key, category, topic, model, questions, created_at, last_used)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, category, topic, model, json.dumps(questions, ensure_ascii=False), now, now),
+                )
+                # 키당 풀 크기 / 전체 상한 초과분은 가장 오래 안 쓰인 것부터 제거
+                conn.execute(
+                    "DELETE FROM variants WHERE cache_key = ? AND id NOT IN ("
+                    " SELECT id FROM variants WHERE cache_key = ? ORDER BY last_used DESC LIMIT ?)",
+                    (key, key, self.pool_size),
+                )
+                conn.execute(
+                    "DELETE FROM variants WHERE id NOT IN ("
+                    " SELECT id FROM variants ORDER BY last_used DESC LIMIT ?)",
+                    (self.max_entries,),
+                )
+        except sqlite3.Error as e:
+            print(f"질문 캐시 저장 실패: {e}")
+
+
+    # ---------- 워밍 풀 (pregen.py 워커가 채우고 시험 생성이 소비) ----------
+    def pool_push(self, category: str, topic: str, prompt: str, questions: List[str],
+                  model: str = QUESTION_MODEL) -> None:
+        if not self.enabled or not questions:
+            return
+        key = self.make_key(category, topic, prompt, model)
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT INTO warm_pool (cache_key, category, topic, questions, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, category, topic, json.dumps(questions, ensure_ascii=False), time.time()),
+                )
+        except sqlite3.Error as e:
+            print(f"워밍 풀 저장 실패: {e}")
+
+    def pool_pop(self, category: str, topic: str, prompt: str, model: str = QUESTION_MODEL) -> Optional[List[str]]:
+        """워밍 풀에서 가장 오래된 변형 하나를 꺼낸다 (없으면 None). 히트/미스를 기록."""
+        if not self.enabled:
+            return None
+        key = self.make_key(category, topic, prompt, model)
+        questions = None
+        try:
+            with closing(self._connect()) as conn, conn:
+                for row_id, payload in conn.execute(
+                        "SELECT id, questions FROM warm_pool WHERE cache_key = ? ORDER BY id LIMIT 3", (key,)).fetchall():
+                    # 다른 프로세스가 먼저 가져갔으면 rowcount가 0 → 다음 후보
+                    if conn.execute("DELETE FROM warm_pool WHERE id = ?", (row_id,)).rowcount:
+                        questions = json.loads(payload)
+                        break
+                self._bump(conn, "pool_hit" if questions is not None else "pool_miss")
+        except sqlite3.Error as e:
+            print(f"워밍 풀 조회 실패: {e}")
+        return questions
+
+    def pool_depths(self) -> Dict[Tuple[str, str], int]:
+        if not self.enabled:
+            return {}
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT category, topic, COUNT(*) FROM warm_pool GROUP BY cache_key").fetchall()
+        return {(category, topic): n for category, topic, n in rows}
+
+    def pool_depth(self, category: str, topic: str, prompt: str, model: str = QUESTION_MODEL) -> int:
+        if not self.enabled:
+            return 0
+        key = self.make_key(category, topic, prompt, model)
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM warm_pool WHERE cache_key = ?", (key,)).fetchone()[0]
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, name: str) -> None:
+        conn.execute(
+            "INSERT INTO pool_stats (name, value) VALUES (?, 1)"
+            " ON CONFLICT(name) DO UPDATE SET value = value + 1", (name,),
+        )
+
+    def stats(self) -> Dict[str, int]:
+        """워밍 풀 히트/미스(프로세스 공유) + 이 프로세스의 변형 캐시 히트/미스."""
+        out = {"cache_hit": self.hits, "cache_miss": self.misses}
+        if self.enabled:
+            with closing(self._connect()) as conn:
+                out.update(dict(conn.execute("SELECT name, value FROM pool_stats").fetchall()))
+        return out
+
+
+question_cache = QuestionCache()
+
+
+# 생성 프롬프트 / 응답 파싱 (동기·비동기 경로 공용)
+_GEN_SYSTEM_PROMPT = "You are a helpful assistant for generating language test questions."
+
+
+def _build_generation_prompt(topic: str, category: str, db_questions: List[str]) -> str:
+    context_str = "\n".join(f"- {q}" for q in db_questions)
+    return (
+        f"You are an OPIC question generator.\n\n"
+        f"Here are some sample questions about the topic '{topic}' in category '{category}':\n"
+        f"{context_str}\n\n"
+        f"Now, generate 3 new OPIC-style questions that are similar in style and difficulty, "
+        f"Make sure they are open-ended and not duplicates of the examples."
+    )
+
+
+def _parse_generated_questions(questions_text: str, questions_needed: int) -> List[str]:
+    questions_list = [q.strip() for q in (questions_text or "").strip().split('\n') if q.strip()]
+    return questions_list[:questions_needed]
+
+
+# 이미 생성된 질문 찾기: 워밍 풀(사전 생성분) → 변형 캐시 재사용 순
+def _lookup_generated(category: str, topic: str, prompt: str) -> Optional[List[str]]:
+    questions = question_cache.pool_pop(category, topic, prompt)
+    if questions is None:
+        questions = question_cache.choose(category, topic, prompt)
+    return questions
 
-    return []
 
 # OpenAI API를 이용해 오픽 질문 생성 전작업
 def generate_openai_questions(prompt: str, questions_needed: int = 3) -> List[str]:
@@ -102,9 +501,37 @@ def generate_openai_questions(prompt: str, questions_needed: int = 3) -> List[st
 
     try:
         response = client.chat.completions.create(
-            model="gpt-3.5-turbo",  # Use an appropriate model
+            model=QUESTION_MODEL,  # Use an appropriate model
+            messages=[
+                {"role": "system", "content": _GEN_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=150,
+            n=1,
+            stop=None,
+            temperature=0.7,
+        )
+        return _parse_generated_questions(response.choices[0].message.content, questions_needed)
+    except Exception as e:
+        print(f"An error occurred with the OpenAI API: {e}")
+        return []
+
+
+# 비동기 OpenAI 클라이언트 (시험 1회 생성 동안 공유)
+def make_async_openai_client() -> AsyncOpenAI:
+    return AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+
+
+# OpenAI API를 이용해 오픽 질문 생성 (비동기)
+async def generate_openai_questions_async(prompt: str, questions_needed: int = 3,
+                                          client: Optional[AsyncOpenAI] = None) -> List[str]:
+    client = client or make_async_openai_client()
+
+    try:
+        response = await client.chat.completions.create(
+            model=QUESTION_MODEL,
             messages=[
-                {"role": "system", "content": "You are a helpful assistant for generating language test questions."},
+                {"role": "system", "content": _GEN_SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
             max_tokens=150,
@@ -112,48 +539,180 @@ def generate_openai_questions(prompt: str, questions_needed: int = 3) -> List[st
             stop=None,
             temperature=0.7,
         )
-        questions_text = response.choices[0].message.content.strip()
-        questions_list = [q.strip() for q in questions_text.split('\n') if q.strip()]
-        return questions_list[:questions_needed]
+        return _parse_generated_questions(response.choices[0].message.content, questions_needed)
     except Exception as e:
         print(f"An error occurred with the OpenAI API: {e}")
         return []
 
 
+# 여러 섹션을 한 번의 JSON 모드 요청으로 생성 (시험 1회 = LLM 호출 1회)
+_BATCH_GEN_SYSTEM_PROMPT = (
+    "You are an OPIC question generator. For every section in the input, write new OPIC-style "
+    "questions that are similar in style and difficulty to its examples, open-ended, and not duplicates "
+    "of the examples. Respond with JSON only: {\"questions\": {\"<topic>\": [\"question\", ...]}}"
+)
+
+
+def _build_batch_generation_prompt(sections: List[Tuple[str, str, List[str]]], questions_needed: int) -> str:
+    payload = {
+        "questions_per_section": questions_needed,
+        "sections": [{"topic": topic, "category": category, "examples": examples}
+                     for topic, category, examples in sections],
+    }
+    return json.dumps(payload, ensure_ascii=False)
+
+
+def _parse_batch_questions(raw: str, topics: List[str], questions_needed: int) -> Dict[str, List[str]]:
+    """{topic: [questions]} 형태를 검증해 올바른 섹션만 반환 (토픽 키는 대소문자 무시)."""
+    try:
+        obj = json.loads(raw or "")
+    except json.JSONDecodeError:
+        return {}
+    if isinstance(obj, dict) and isinstance(obj.get("questions"), dict):
+        obj = obj["questions"]
+    if not isinstance(obj, dict):
+        return {}
+
+    by_key = {_normalize_key(str(k)): v for k, v in obj.items()}
+    out: Dict[str, List[str]] = {}
+    for topic in topics:
+        value = by_key.get(_normalize_key(topic))
+        if not isinstance(value, list):
+            continue
+        questions = [q.strip() for q in value if isinstance(q, str) and q.strip()]
+        if questions:
+            out[topic] = questions[:questions_needed]
+    return out
+
+
+async def generate_openai_questions_batch_async(sections: List[Tuple[str, str, List[str]]],
+                                                questions_needed: int = 3,
+                                                client: Optional[AsyncOpenAI] = None) -> Dict[str, List[str]]:
+    """
+    sections: [(topic, category, examples), ...]
+    반환: {topic: [questions]} — 형식이 맞지 않거나 빠진 섹션은 포함하지 않는다.
+    """
+    if not sections:
+        return {}
+    client = client or make_async_openai_client()
+
+    try:
+        response = await client.chat.completions.create(
+            model=QUESTION_MODEL,
+            messages=[
+                {"role": "system", "content": _BATCH_GEN_SYSTEM_PROMPT},
+                {"role": "user", "content": _build_batch_generation_prompt(sections, questions_needed)}
+            ],
+            max_tokens=60 + 50 * questions_needed * len(sections),
+            temperature=0.7,
+            response_format={"type": "json_object"},
+        )
+        raw = response.choices[0].message.content
+        return _parse_batch_questions(raw, [topic for topic, _, _ in sections], questions_needed)
+    except Exception as e:
+        print(f"An error occurred with the OpenAI API (batch): {e}")
+        return {}
+
+
 # 질문 생성
-def make_questions(topic: str, category: str, level: str, count: int) -> List[str]:
+def make_questions(topic: str, category: str, level: str, count: int,
+                   db_questions: Optional[List[str]] = None) -> List[str]:
     """
     Generates OPIC questions:
-    - Fetches questions from the DB
+    - Fetches questions from the in-memory question bank
+      (or uses db_questions prefetched with QuestionBank.get_many)
     - Uses them as context to generate 3 similar additional questions
     """
 
-    db_questions = []
-
-    # 1. Get questions from the database based on the category and topic
-    if category == 'survey':
-        db_questions = get_questions_from_db(topic)
-    elif category == 'role_play':
-        db_questions = get_role_play_questions_from_db(topic)
-    elif category == 'random_question':
-        db_questions = get_random_questions_from_db(topic)
+    # 1. Get questions from the in-memory bank (no DB round trip per topic)
+    if db_questions is None:
+        db_questions = list(question_bank.get(category, topic))
 
     # 2. Always generate 3 additional similar questions using OpenAI
     # f"appropriate for a speaker at an {level} level. "
     openai_questions = []
     if db_questions:  # context가 있어야만 실행
-        context_str = "\n".join(f"- {q}" for q in db_questions)
-        prompt = (
-            f"You are an OPIC question generator.\n\n"
-            f"Here are some sample questions about the topic '{topic}' in category '{category}':\n"
-            f"{context_str}\n\n"
-            f"Now, generate 3 new OPIC-style questions that are similar in style and difficulty, "
-            f"Make sure they are open-ended and not duplicates of the examples."
-        )
-        openai_questions = generate_openai_questions(prompt, 3)
+        prompt = _build_generation_prompt(topic, category, db_questions)
+        openai_questions = _lookup_generated(category, topic, prompt)
+        if openai_questions is None:
+            openai_questions = generate_openai_questions(prompt, 3)
+            question_cache.add(category, topic, prompt, openai_questions)
 
     # 3. Combine DB + AI questions
     final_questions = db_questions + openai_questions
 
     # 4. Return, but still respect 'count'
     return final_questions[:count]
+
+
+# 질문 생성 (비동기: 여러 섹션을 동시에 생성할 때 사용)
+async def make_questions_async(topic: str, category: str, level: str, count: int,
+                               db_questions: Optional[List[str]] = None,
+                               client: Optional[AsyncOpenAI] = None) -> List[str]:
+    """make_questions와 동일한 규칙, LLM 호출만 AsyncOpenAI로 대기."""
+    if db_questions is None:
+        db_questions = list(question_bank.get(category, topic))
+
+    openai_questions = []
+    if db_questions:
+        prompt = _build_generation_prompt(topic, category, db_questions)
+        openai_questions = _lookup_generated(category, topic, prompt)
+        if openai_questions is None:
+            openai_questions = await generate_openai_questions_async(prompt, 3, client=client)
+            question_cache.add(category, topic, prompt, openai_questions)
+
+    return (db_questions + openai_questions)[:count]
+
+
+# 시험 전체 섹션 생성 (워밍 풀/캐시 → 남은 섹션만 배치 1회 → 빠진 섹션만 개별 보정)
+async def make_exam_questions_async(sections: List[Tuple[str, str, int]], level: str,
+                                    contexts: Optional[Dict[Tuple[str, str], List[str]]] = None,
+                                    client: Optional[AsyncOpenAI] = None) -> List[List[str]]:
+    """
+    sections: [(topic, category, count), ...]
+    반환: 섹션 순서대로 질문 리스트
+    """
+    if contexts is None:
+        contexts = question_bank.get_many([(category, topic) for topic, category, _ in sections])
+
+    db_lists: List[List[str]] = []
+    generated: List[Optional[List[str]]] = []
+    pending: Dict[str, Tuple[int, str, str, List[str]]] = {}  # topic -> (섹션 idx, category, prompt, examples)
+    for idx, (topic, category, _) in enumerate(sections):
+        db_questions = list(contexts.get((category, topic), []))
+        db_lists.append(db_questions)
+        found: Optional[List[str]] = []
+        if db_questions:  # context가 있어야만 생성
+            prompt = _build_generation_prompt(topic, category, db_questions)
+            found = _lookup_generated(category, topic, prompt)
+            if found is None and topic not in pending:
+                pending[topic] = (idx, category, prompt, db_questions)
+        generated.append(found)
+
+    if pending:
+        batch = await generate_openai_questions_batch_async(
+            [(topic, category, examples) for topic, (_, category, _, examples) in pending.items()],
+            3, client=client,
+        )
+        for topic, (idx, category, prompt, _) in pending.items():
+            if topic in batch:
+                generated[idx] = batch[topic]
+                question_cache.add(category, topic, prompt, batch[topic])
+
+    # 배치 응답에서 빠진 섹션만 개별 요청으로 보정 (동시 호출 수 제한)
+    missing = [idx for idx, found in enumerate(generated) if found is None]
+    if missing:
+        semaphore = asyncio.Semaphore(QUESTION_GEN_CONCURRENCY)
+
+        async def _fallback(idx: int) -> None:
+            topic, category, _ = sections[idx]
+            prompt = _build_generation_prompt(topic, category, db_lists[idx])
+            async with semaphore:
+                questions = await generate_openai_questions_async(prompt, 3, client=client)
+            generated[idx] = questions
+            question_cache.add(category, topic, prompt, questions)
+
+        await asyncio.gather(*(_fallback(idx) for idx in missing))
+
+    return [(db_lists[idx] + (generated[idx] or []))[:count]
+            for idx, (_, _, count) in enumerate(sections)]
@@ -4,4 +4,14 @@ import os, sys, subprocess
 # 현재 디렉토리를 기준으로 상대 경로 설정
 current_dir = os.path.dirname(os.path.abspath(__file__))
 script = os.path.join(current_dir, "app", "main.py")
-subprocess.run([sys.executable, "-m", "streamlit", "run", script, "--server.port=8503"], check=True)
+
+# --pregen 또는 OPIC_PREGEN=1 이면 질문 사전 생성 워커(pregen.py)를 별도 프로세스로 함께 실행
+workers = []
+if "--pregen" in sys.argv or os.getenv("OPIC_PREGEN") == "1":
+    workers.append(subprocess.Popen([sys.executable, os.path.join(current_dir, "pregen.py")], cwd=current_dir))
+
+try:
+    subprocess.run([sys.executable, "-m", "streamlit", "run", script, "--server.port=8503"], check=True)
+finally:
+    for w in workers:
+        w.terminate()
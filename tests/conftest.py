@@ -0,0 +1,172 @@
+# pytest 공용: 저장소 루트를 import 경로에 추가 (app.*, quest 등 최상위 모듈을 바로 import) + 가짜 LLM 클라이언트 / MongoDB
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+# ---------- 가짜 LLM 클라이언트 (네트워크 없이 지연/동시 호출 수 측정) ----------
+class FakeResponse:
+    """chat.completions.create 응답 모양: resp.choices[0].message.content"""
+
+    def __init__(self, content: str):
+        message = type("Message", (), {"content": content})()
+        self.choices = [type("Choice", (), {"message": message})()]
+
+
+class FakeCompletions:
+    """
+    reply(kwargs) -> 응답 문자열. 호출마다 latency초 기다리고 호출 수/최대 동시 호출 수를 센다.
+    is_async=True면 AsyncOpenAI처럼 create가 코루틴.
+    """
+
+    def __init__(self, reply, latency: float = 0.0, is_async: bool = False):
+        self.reply = reply
+        self.latency = latency
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = []
+        self._lock = threading.Lock()
+        if is_async:
+            self.create = self._create_async
+
+    def _enter(self, kwargs):
+        with self._lock:
+            self.calls += 1
+            self.requests.append(kwargs)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def create(self, **kwargs):
+        self._enter(kwargs)
+        try:
+            time.sleep(self.latency)
+            return FakeResponse(self.reply(kwargs))
+        finally:
+            self._exit()
+
+    async def _create_async(self, **kwargs):
+        self._enter(kwargs)
+        try:
+            await asyncio.sleep(self.latency)
+            return FakeResponse(self.reply(kwargs))
+        finally:
+            self._exit()
+
+
+class FakeChatClient:
+    def __init__(self, completions: FakeCompletions):
+        self.chat = type("Chat", (), {})()
+        self.chat.completions = completions
+
+
+@pytest.fixture
+def fake_chat_client():
+    """fake_chat_client(reply, latency=0.0, is_async=False) -> client (client.chat.completions로 통계 확인)"""
+    def _make(reply, latency: float = 0.0, is_async: bool = False) -> FakeChatClient:
+        return FakeChatClient(FakeCompletions(reply, latency, is_async))
+    return _make
+
+
+# ---------- 가짜 MongoDB (프로세스 내 대역: 클라이언트 생성/ping/쿼리/인덱스 기록) ----------
+def _matches(doc, query) -> bool:
+    for key, cond in query.items():
+        if key == "$or":
+            if not any(_matches(doc, sub) for sub in cond):
+                return False
+        elif isinstance(cond, dict) and "$in" in cond:
+            if doc.get(key) not in cond["$in"]:
+                return False
+        elif isinstance(cond, dict):
+            raise AssertionError(f"정확 일치/$in 이외의 조건: {key}={cond}")
+        elif doc.get(key) != cond:
+            return False
+    return True
+
+
+class FakeCollection:
+    def __init__(self, database, name):
+        self.database = database
+        self.name = name
+        self.full_name = f"{database.name}.{name}"
+        self.docs = []
+        self.queries = []
+        self.indexes = []
+
+    def create_index(self, keys, name=None, unique=False):
+        self.indexes.append({"keys": list(keys), "name": name, "unique": unique})
+        return name
+
+    def find(self, query=None, projection=None):
+        self.queries.append(query or {})
+        return [dict(d) for d in self.docs if _matches(d, query or {})]
+
+    def find_one(self, query=None, projection=None):
+        found = self.find(query, projection)
+        return found[0] if found else None
+
+
+class FakeDatabase:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+        self._collections = {}
+
+    def __getitem__(self, name):
+        return self._collections.setdefault(name, FakeCollection(self, name))
+
+
+class FakeMongoClient:
+    instances = []
+
+    def __init__(self, uri, **kwargs):
+        self.uri = uri
+        self.kwargs = kwargs
+        self.pings = 0
+        self.fail_ping = False
+        self.closed = False
+        self._databases = {}
+        self.admin = type("Admin", (), {"command": self._command})()
+        FakeMongoClient.instances.append(self)
+
+    def _command(self, name):
+        assert name == "ping"
+        self.pings += 1
+        if self.fail_ping:
+            raise ConnectionError("server unavailable")
+        return {"ok": 1}
+
+    def __getitem__(self, name):
+        return self._databases.setdefault(name, FakeDatabase(self, name))
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_mongo(monkeypatch):
+    """db.db의 MongoClient를 FakeMongoClient로 바꾸고 클라이언트/인덱스 레지스트리를 비운다. db 모듈 반환."""
+    pytest.importorskip("pymongo")
+    pytest.importorskip("dotenv")
+    os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")  # db.db 임포트 조건 (연결은 하지 않음)
+    from db import db as dbmod
+
+    FakeMongoClient.instances = []
+    monkeypatch.setattr(dbmod, "MongoClient", FakeMongoClient)
+    dbmod.close_clients()
+    dbmod._indexed_collections.clear()
+    yield dbmod
+    dbmod.close_clients()
+    dbmod._indexed_collections.clear()
@@ -0,0 +1,35 @@
+# MongoDB 클라이언트 재사용: 가짜 클라이언트로 조회당 클라이언트 생성/ping 횟수 확인
+from conftest import FakeMongoClient
+
+
+def test_one_client_and_one_ping_for_many_lookups(fake_mongo, monkeypatch):
+    monkeypatch.setattr(fake_mongo, "MONGO_HEALTHCHECK_INTERVAL", 3600)
+    collections = [fake_mongo.connect_db("opic_samples") for _ in range(50)]
+
+    assert len(FakeMongoClient.instances) == 1
+    client = FakeMongoClient.instances[0]
+    assert client.pings == 1
+    assert all(c is collections[0] for c in collections)
+    assert client.kwargs["maxPoolSize"] == fake_mongo.MONGO_MAX_POOL_SIZE
+    assert client.kwargs["serverSelectionTimeoutMS"] == fake_mongo.MONGO_SERVER_SELECTION_TIMEOUT_MS
+
+
+def test_healthcheck_interval_bounds_pings(fake_mongo, monkeypatch):
+    monkeypatch.setattr(fake_mongo, "MONGO_HEALTHCHECK_INTERVAL", 0)
+    for _ in range(5):
+        fake_mongo.connect_db("opic_samples")
+    assert len(FakeMongoClient.instances) == 1
+    assert FakeMongoClient.instances[0].pings == 5
+
+
+def test_failed_ping_drops_client_and_reconnects(fake_mongo, monkeypatch):
+    monkeypatch.setattr(fake_mongo, "MONGO_HEALTHCHECK_INTERVAL", 0)
+    assert fake_mongo.connect_db("opic_samples") is not None
+    first = FakeMongoClient.instances[0]
+    first.fail_ping = True
+
+    assert fake_mongo.connect_db("opic_samples") is None
+    assert first.closed
+
+    assert fake_mongo.connect_db("opic_samples") is not None
+    assert len(FakeMongoClient.instances) == 2
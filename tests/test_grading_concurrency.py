@@ -0,0 +1,83 @@
+# 채점 배치 동시 실행: 지연이 있는 가짜 LLM 클라이언트로 벽시계 시간/동시 호출 수 확인 (네트워크 불필요)
+import json
+import time
+
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("dotenv")
+pytest.importorskip("numpy")
+
+from app.utils.openai_api import comprehensive_tutor as ct
+
+LATENCY = 0.2  # 가짜 LLM 호출 1회 지연(초)
+
+
+def _grade_reply(kwargs):
+    """배치 채점 요청에 목표 길이를 지킨 결과를 돌려준다."""
+    payload = json.loads(kwargs["messages"][1]["content"])
+    items = [{
+        "question_num": q["question_num"],
+        "score": 70,
+        "strengths": ["질문에 맞게 답함"],
+        "improvements": ["전환어 사용"],
+        "sample_answer": " ".join(["word"] * (sum(q["target_words"]) // 2)) + ".",
+    } for q in payload["qa"]]
+    return json.dumps({
+        "overall_score": 70,
+        "opic_level": "IM2",
+        "level_description": "IM2 수준",
+        "individual_feedback": items,
+        "overall_strengths": ["s"],
+        "priority_improvements": ["p"],
+        "study_recommendations": "r",
+    })
+
+
+def _exam(n=15):
+    questions = [f"Question {i}" for i in range(n)]
+    answers = [" ".join(["answer"] * (30 + 10 * (i % 5))) for i in range(n)]
+    return questions, answers
+
+
+@pytest.fixture
+def tutor_factory(monkeypatch, fake_chat_client):
+    # 캐시는 테스트마다 새로, 배치는 3문항씩 잘라 15문항 = 5배치 (API 키는 클라이언트 생성용 더미)
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(ct, "grade_cache", ct.GradeCache())
+    monkeypatch.setattr(ct, "GRADE_BATCH_MAX_ITEMS", 3)
+
+    def _make(max_concurrency):
+        tutor = ct.ComprehensiveOPIcTutor(max_concurrency=max_concurrency)
+        tutor.client = fake_chat_client(_grade_reply, LATENCY)
+        return tutor
+    return _make
+
+
+def test_batches_run_concurrently(tutor_factory):
+    tutor = tutor_factory(max_concurrency=5)
+    questions, answers = _exam()
+
+    started = time.perf_counter()
+    result = tutor.get_comprehensive_feedback(questions, answers, {"level": "IM"})
+    elapsed = time.perf_counter() - started
+    print(f"\n5 batches, concurrency 5: {elapsed:.2f}s (sequential ≈ {5 * LATENCY:.1f}s)")
+
+    assert result["_debug_llm_calls"] == {"batch": 5}
+    assert [it["question_num"] for it in result["individual_feedback"]] == list(range(1, 16))
+    assert tutor.client.chat.completions.max_in_flight == 5
+    # 배치 하나 시간에 가까워야 함 (순차 실행이면 5 * LATENCY)
+    assert elapsed < 2.5 * LATENCY
+
+
+def test_concurrency_cap_is_respected(tutor_factory):
+    tutor = tutor_factory(max_concurrency=2)
+    questions, answers = _exam()
+
+    started = time.perf_counter()
+    tutor.get_comprehensive_feedback(questions, answers, {"level": "IM"})
+    elapsed = time.perf_counter() - started
+
+    assert tutor.client.chat.completions.max_in_flight == 2
+    # 5배치를 2개씩: 3라운드
+    assert 3 * LATENCY <= elapsed < 4.5 * LATENCY
@@ -0,0 +1,49 @@
+# 백그라운드 채점 워커: 튜터 생성 실패가 Future로 전달되는지, 워커 전용 동시 호출 상한 확인
+import time
+
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("dotenv")
+pytest.importorskip("numpy")
+
+from app.utils.openai_api import grading_worker as gw
+
+
+class _FailingTutor:
+    def __init__(self, *args, **kwargs):
+        raise RuntimeError("no credentials")
+
+
+class _RecordingTutor:
+    created = []
+
+    def __init__(self, max_concurrency):
+        self.max_concurrency = max_concurrency
+        _RecordingTutor.created.append(self)
+
+    def pregrade(self, pairs, profile):
+        return len(pairs)
+
+
+def test_tutor_construction_error_resolves_futures(monkeypatch):
+    monkeypatch.setattr(gw, "ComprehensiveOPIcTutor", _FailingTutor)
+    worker = gw.GradingWorker(group_size=2, linger=60)
+    futures = [worker.submit("s1", f"Q{i}", "answer", {}) for i in range(2)]
+
+    started = time.perf_counter()
+    done = [f.exception(timeout=5) for f in futures]
+    assert time.perf_counter() - started < 1
+    assert all(isinstance(e, RuntimeError) for e in done)
+    assert worker.failed == 2
+
+
+def test_worker_tutor_has_its_own_llm_limit(monkeypatch):
+    monkeypatch.setattr(gw, "ComprehensiveOPIcTutor", _RecordingTutor)
+    _RecordingTutor.created.clear()
+    worker = gw.GradingWorker(group_size=1, linger=60, llm_concurrency=7)
+    futures = [worker.submit(f"s{i}", "Q", "answer", {}) for i in range(3)]
+    assert all(f.result(timeout=5) for f in futures)
+    assert len(_RecordingTutor.created) == 1
+    assert _RecordingTutor.created[0].max_concurrency == 7
+    assert worker.graded == 3
@@ -0,0 +1,87 @@
+# 휴리스틱 예비 채점기: 동작 확인 + 수천 개 합성 답변 벤치마크
+import random
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.utils import heuristic_scorer as hs
+from app.utils.opic_levels import score_to_level
+
+VOCAB = ("i really like going to the park with my friends on weekends and we usually "
+         "play soccer or walk around the lake near my house").split()
+TRANSITIONS = ["However,", "For example,", "Additionally,", "As a result,"]
+
+
+def _synthetic_answers(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    answers = []
+    for _ in range(n):
+        words = [rng.choice(VOCAB) for _ in range(rng.choice([0, 5, 20, 45, 80, 130]))]
+        for _ in range(rng.randint(0, 3)):
+            if words:
+                words.insert(rng.randrange(len(words)), rng.choice(TRANSITIONS))
+        if words and rng.random() < 0.2:
+            words.append("그래서 좋아요")
+        if words and rng.random() < 0.2:
+            words[:0] = ["um", "you", "know"]
+        answers.append(". ".join(" ".join(words).split(" and ")))
+    return answers
+
+
+def test_no_answer_scores_zero():
+    assert hs.score_answers(["", "무응답"]) == [0, 0]
+    item = hs.heuristic_item(1, "무응답")
+    assert item["score"] == 0 and item["strengths"] == []
+
+
+def test_answered_questions_never_score_zero():
+    # 한국어로만 답해도 답변이 있으면 0점이 아님 (무응답만 0점)
+    korean = "저는 영화를 좋아해요 정말로"
+    assert hs.score_answers([korean])[0] > 0
+    assert hs.extract_features([korean])[0][hs.FEATURES.index("hangul_ratio")] > 0
+    fb = hs.provisional_feedback([korean, "123", "", "무응답"])
+    scores = [it["score"] for it in fb["individual_feedback"]]
+    assert scores[0] >= 30 and scores[1] >= 30
+    assert scores[2:] == [0, 0]
+    assert "한국어 대신 영어 표현 사용" in fb["individual_feedback"][0]["improvements"]
+
+
+def test_longer_connected_answer_scores_higher():
+    short = "I like cafes."
+    long = ("I like going to cafes with my friends on weekends. However, I rarely go alone. "
+            "For example, last Saturday we tried a new place near the station and ordered lattes. "
+            "As a result, it became our favorite spot, and we now meet there almost every week.")
+    s_short, s_long = hs.score_answers([short, long])
+    assert s_long > s_short
+
+
+def test_hangul_and_fillers_are_penalized():
+    clean = "I usually watch movies at home. However, sometimes I go to the theater with my sister."
+    mixed = "I usually watch 영화 at home. However, 가끔 I go to the theater with my sister."
+    filler = "um I usually um watch movies you know at home. um However, sometimes I go um to the theater."
+    s_clean, s_mixed, s_filler = hs.score_answers([clean, mixed, filler])
+    assert s_mixed < s_clean
+    assert s_filler < s_clean
+
+
+def test_provisional_feedback_matches_level_scale():
+    answers = _synthetic_answers(15, seed=1)
+    fb = hs.provisional_feedback(answers)
+    assert len(fb["individual_feedback"]) == 15
+    assert [it["question_num"] for it in fb["individual_feedback"]] == list(range(1, 16))
+    assert fb["opic_level"] == score_to_level(fb["overall_score"])
+    assert all(0 <= it["score"] <= 100 for it in fb["individual_feedback"])
+
+
+def test_benchmark_thousands_of_answers():
+    answers = _synthetic_answers(5000)
+    started = time.perf_counter()
+    scores = hs.score_answers(answers)
+    elapsed = time.perf_counter() - started
+    print(f"\nheuristic scorer: {len(answers)} answers in {elapsed * 1000:.0f} ms "
+          f"({elapsed / len(answers) * 1e6:.0f} us/answer)")
+    assert len(scores) == 5000
+    # 한 시험(15문항)은 수 ms, 5000개도 수 초 안에 끝나야 예비 결과로 쓸 수 있음
+    assert elapsed < 10
@@ -0,0 +1,77 @@
+# 시험 섹션 비동기 생성: 지연이 있는 가짜 AsyncOpenAI 클라이언트로 벽시계 시간/동시 호출 수 확인 (네트워크 불필요)
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("dotenv")
+pytest.importorskip("pymongo")
+
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")  # db.db 임포트 조건 (연결은 하지 않음)
+
+import quest
+
+LATENCY = 0.2  # 가짜 LLM 호출 1회 지연(초)
+
+SECTIONS = [
+    ("movies", "survey", 3),
+    ("cafe", "survey", 3),
+    ("park", "survey", 3),
+    ("Item Purchase", "role_play", 3),
+    ("weather", "random_question", 2),
+]
+CONTEXTS = {(category, topic): [f"Example question about {topic}?"] for topic, category, _ in SECTIONS}
+
+
+def _question_reply(answer_batch: bool = True):
+    """answer_batch=False면 배치 요청에 빈 결과를 돌려 개별 보정 경로를 탄다."""
+    def reply(kwargs):
+        if kwargs["messages"][0]["content"] == quest._BATCH_GEN_SYSTEM_PROMPT:
+            if not answer_batch:
+                return json.dumps({"questions": {}})
+            payload = json.loads(kwargs["messages"][1]["content"])
+            n = payload["questions_per_section"]
+            return json.dumps({"questions": {
+                s["topic"]: [f"New question {i} about {s['topic']}?" for i in range(n)]
+                for s in payload["sections"]
+            }})
+        return "\n".join(f"Generated question {i}?" for i in range(3))
+    return reply
+
+
+@pytest.fixture(autouse=True)
+def _no_question_cache(monkeypatch):
+    # 디스크 캐시/워밍 풀을 끄고 매번 LLM 경로를 탄다
+    monkeypatch.setattr(quest, "question_cache", quest.QuestionCache(path=""))
+    monkeypatch.setattr(quest, "QUESTION_GEN_CONCURRENCY", 5)
+
+
+def _generate(client):
+    started = time.perf_counter()
+    result = asyncio.run(quest.make_exam_questions_async(SECTIONS, "level_5", contexts=CONTEXTS, client=client))
+    return result, time.perf_counter() - started
+
+
+def test_whole_exam_in_one_batch_call(fake_chat_client):
+    client = fake_chat_client(_question_reply(), LATENCY, is_async=True)
+    result, elapsed = _generate(client)
+
+    assert client.chat.completions.calls == 1
+    assert [len(qs) for qs in result] == [count for _, _, count in SECTIONS]
+    assert elapsed < 2 * LATENCY
+
+
+def test_missing_sections_are_generated_concurrently(fake_chat_client):
+    client = fake_chat_client(_question_reply(answer_batch=False), LATENCY, is_async=True)
+    result, elapsed = _generate(client)
+    print(f"\nbatch + 5 fallbacks: {elapsed:.2f}s (sequential ≈ {6 * LATENCY:.1f}s)")
+
+    completions = client.chat.completions
+    assert completions.calls == 1 + len(SECTIONS)
+    assert completions.max_in_flight == len(SECTIONS)
+    assert all(len(qs) == count for qs, (_, _, count) in zip(result, SECTIONS))
+    # 배치 1회 + 개별 보정 1라운드 (순차라면 6 * LATENCY)
+    assert elapsed < 3.5 * LATENCY
@@ -0,0 +1,102 @@
+# 잘린 채점 응답 복구(_salvage_feedback_json) 퍼즈 테스트: 임의 지점에서 자른 JSON으로 확인
+import json
+import random
+
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("dotenv")
+pytest.importorskip("numpy")
+
+from app.utils.openai_api import comprehensive_tutor as ct
+
+
+def _payload(rng: random.Random, n: int) -> dict:
+    return {
+        "overall_score": 70,
+        "opic_level": "IM2",
+        "level_description": "설명 " * 20,
+        "individual_feedback": [{
+            "question_num": i + 1,
+            "score": rng.randint(40, 90),
+            "strengths": ['좋아요, "인용" {괄호}'],
+            "improvements": ["개선 ]"],
+            "sample_answer": " ".join(["word"] * rng.randint(60, 140)),
+        } for i in range(n)],
+        "overall_strengths": ["x"],
+        "priority_improvements": ["y"],
+        "study_recommendations": "z",
+    }
+
+
+def test_complete_response_is_unchanged():
+    obj = _payload(random.Random(1), 5)
+    for indent in (None, 2):
+        text = json.dumps(obj, ensure_ascii=False, indent=indent)
+        assert ct._salvage_feedback_json(text) == obj
+        assert ct._salvage_feedback_json("```json\n" + text + "\n```") == obj
+
+
+def test_garbage_returns_empty():
+    for text in ("", "no json here", "{", '{"overall_score": ', "[1, 2"):
+        assert ct._salvage_feedback_json(text) == {}
+
+
+def test_cut_off_numbers_and_literals_are_dropped():
+    assert ct._salvage_feedback_json('{"overall_score": 7') == {}
+    assert ct._salvage_feedback_json('{"overall_score": 70') == {}
+    assert ct._salvage_feedback_json('{"overall_score": 70 ') == {}
+    assert ct._salvage_feedback_json('{"overall_score": 70,') == {"overall_score": 70}
+    assert ct._salvage_feedback_json('{"a": "IM2", "ok": true') == {"a": "IM2"}
+    assert ct._salvage_feedback_json('{"a": "IM2", "ok": true}') == {"a": "IM2", "ok": True}
+
+
+def _check_truncation(obj: dict, full: str, cut: int) -> int:
+    """잘린 응답에서 건진 문항 수 반환 (완성된 문항/값만 원본과 같게 남아야 함)."""
+    # 잘린 지점 전에 끝까지 닫힌 문항 수
+    ends = [full.index(json.dumps(it, ensure_ascii=False)) + len(json.dumps(it, ensure_ascii=False))
+            for it in obj["individual_feedback"]]
+    complete = sum(1 for end in ends if end <= cut)
+
+    salvaged = ct._salvage_feedback_json(full[:cut])
+    items = salvaged.get("individual_feedback", [])
+    assert items == obj["individual_feedback"][:len(items)]
+    assert len(items) == complete
+    for key, value in salvaged.items():
+        if key != "individual_feedback":
+            assert value == obj[key], (key, full[:cut][-30:])
+    return len(items)
+
+
+def test_every_cut_inside_top_level_scalars():
+    obj = _payload(random.Random(2), 2)
+    full = json.dumps(obj, ensure_ascii=False)
+    end = full.index('"individual_feedback"')
+    for cut in range(1, end + 1):
+        _check_truncation(obj, full, cut)
+
+
+def test_fuzz_truncated_responses_keep_only_complete_items():
+    rng = random.Random(0)
+    old_items = new_items = 0
+    for _ in range(500):
+        obj = _payload(rng, rng.randint(2, 8))
+        full = json.dumps(obj, ensure_ascii=False)
+        cut = rng.randint(1, len(full) - 1)
+        new_items += _check_truncation(obj, full, cut)
+        try:
+            old_items += len(json.loads(full[:cut]).get("individual_feedback", []))
+        except ValueError:
+            pass
+    print(f"\nitems recovered from truncated output: json.loads={old_items}, salvage={new_items}")
+    assert new_items > old_items
+
+
+def test_fuzz_indented_responses_never_invent_items():
+    rng = random.Random(1)
+    for _ in range(300):
+        obj = _payload(rng, rng.randint(2, 6))
+        full = json.dumps(obj, ensure_ascii=False, indent=2)
+        salvaged = ct._salvage_feedback_json(full[:rng.randint(1, len(full) - 1)])
+        items = salvaged.get("individual_feedback", [])
+        assert items == obj["individual_feedback"][:len(items)]
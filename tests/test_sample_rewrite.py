@@ -0,0 +1,57 @@
+# 모범답안 길이 보정: 가짜 LLM 클라이언트로 호출 수 확인 (문항마다가 아니라 배치마다 재작성 1회)
+import json
+
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("dotenv")
+pytest.importorskip("numpy")
+
+from app.utils.openai_api import comprehensive_tutor as ct
+
+
+def _reply(kwargs):
+    """채점 응답의 모범답안은 전부 너무 짧게, 재작성 요청에는 question_num을 문자열로 돌려준다."""
+    payload = json.loads(kwargs["messages"][1]["content"])
+    if "rewrites" in kwargs["messages"][0]["content"]:
+        return json.dumps({"rewrites": [{
+            "question_num": str(it["question_num"]),
+            "sample_answer": f"Rewrite {it['question_num']}. " + " ".join(["word"] * (sum(it["target_words"]) // 2 - 2)),
+        } for it in payload["items"]]})
+    return json.dumps({
+        "overall_score": 70,
+        "opic_level": "IM2",
+        "level_description": "IM2 수준",
+        "individual_feedback": [{
+            "question_num": q["question_num"],
+            "score": 70,
+            "strengths": ["s"],
+            "improvements": ["i"],
+            "sample_answer": "Too short.",
+        } for q in payload["qa"]],
+        "overall_strengths": ["s"],
+        "priority_improvements": ["p"],
+        "study_recommendations": "r",
+    })
+
+
+def test_out_of_range_samples_are_rewritten_once_per_batch(monkeypatch, fake_chat_client):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(ct, "grade_cache", ct.GradeCache())
+    monkeypatch.setattr(ct, "GRADE_BATCH_MAX_ITEMS", 3)
+    tutor = ct.ComprehensiveOPIcTutor()
+    tutor.client = fake_chat_client(_reply)
+
+    questions = [f"Question {i}" for i in range(15)]
+    answers = [" ".join(["answer"] * (20 + 15 * (i % 4))) for i in range(15)]
+    result = tutor.get_comprehensive_feedback(questions, answers, {"level": "IM"})
+
+    # 15문항 = 5배치: 예전 방식이면 sample_rewrite가 문항마다 15회
+    assert result["_debug_llm_calls"] == {"batch": 5, "sample_rewrite": 5}
+    assert tutor.call_counts == {"batch": 5, "sample_rewrite": 5}
+    for item in result["individual_feedback"]:
+        # 문자열 question_num도 매칭돼 로컬 대체문이 아니라 재작성 결과가 들어가야 함
+        assert item["sample_answer"].startswith(f"Rewrite {item['question_num']}.")
+        assert not item.get("_local_sample")
+        tmin, tmax = tutor._target_range(answers[item["question_num"] - 1])
+        assert tmin <= ct._word_count(item["sample_answer"]) <= tmax
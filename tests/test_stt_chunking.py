@@ -0,0 +1,124 @@
+# 긴 녹음 분할 전사: 합성 오디오 + 가짜 STT 백엔드로 분할 지점/이어 붙이기 순서/지연 단축 확인 (네트워크 불필요)
+import re
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("streamlit")
+pytest.importorskip("openai")
+pytest.importorskip("dotenv")
+
+from app.utils import voice_utils as vu
+
+RATE = 16000
+WORD_S = 0.4          # 단어 하나 = 주파수가 다른 사인파 구간
+WORD_GAP_S = 0.1      # 단어 사이 짧은 쉼
+SENTENCE_GAP_S = 0.7  # 5단어마다 문장 사이 무음
+BASE_HZ, STEP_HZ = 300.0, 25.0
+SECONDS_PER_AUDIO_S = 0.02  # 가짜 Whisper 지연: 오디오 1초당 20ms
+
+
+def _synthetic_speech(n_words: int) -> np.ndarray:
+    """단어 i는 BASE_HZ + i * STEP_HZ 사인파. 전사 결과로 단어 순서를 복원할 수 있다."""
+    t = np.arange(int(WORD_S * RATE)) / RATE
+    parts = []
+    for i in range(n_words):
+        parts.append(0.5 * np.sin(2 * np.pi * (BASE_HZ + i * STEP_HZ) * t))
+        gap = SENTENCE_GAP_S if i % 5 == 4 else WORD_GAP_S
+        parts.append(np.zeros(int(gap * RATE)))
+    return np.concatenate(parts).astype(np.float32)
+
+
+def _fake_transcribe(wav: bytes) -> str:
+    """소리 구간마다 주파수로 단어 번호를 읽는다 (0.15초 미만 조각은 무시)."""
+    x, rate = vu.decode_wav(wav)
+    x = vu.downmix(x)
+    frame = rate // 100
+    n = len(x) // frame
+    active = np.sqrt(np.mean(x[:n * frame].reshape(n, frame) ** 2, axis=1)) > 0.05
+    words, start = [], None
+    for idx, on in enumerate(np.append(active, False)):
+        if on and start is None:
+            start = idx
+        elif not on and start is not None:
+            if idx - start >= 15:
+                seg = x[start * frame: idx * frame]
+                spectrum = np.abs(np.fft.rfft(seg))
+                hz = np.argmax(spectrum) * rate / len(seg)
+                words.append(f"w{int(round((hz - BASE_HZ) / STEP_HZ))}")
+            start = None
+    time.sleep(len(x) / rate * SECONDS_PER_AUDIO_S)
+    return " ".join(words)
+
+
+class _FakeTranscriptions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, model, file, language):
+        self.calls += 1
+        return type("Transcript", (), {"text": _fake_transcribe(file.getvalue())})()
+
+
+class _FakeAudioClient:
+    def __init__(self):
+        self.audio = type("Audio", (), {})()
+        self.audio.transcriptions = _FakeTranscriptions()
+
+
+def _voice_manager():
+    vm = vu.VoiceManager()
+    vm.openai_client = _FakeAudioClient()
+    return vm
+
+
+def test_split_points_fall_in_silence():
+    x = _synthetic_speech(120)
+    points = vu.find_split_points(x, RATE)
+    assert points == sorted(points) and len(points) >= 3
+    for p in points:
+        assert np.max(np.abs(x[p - 80:p + 80])) < 1e-3
+
+
+@pytest.mark.parametrize("target_s", [0.5, 2.0, 3.0])
+def test_split_points_always_advance_with_short_target(target_s):
+    # 목표 길이가 탐색 창(3초) 이하여도 무한 루프 없이 끝나야 함
+    x = _synthetic_speech(30)
+    points = vu.find_split_points(x, RATE, target_s=target_s)
+    assert points
+    assert all(b > a for a, b in zip([0] + points, points))
+
+
+def test_stitch_transcripts_removes_overlap():
+    texts = ["I went to the park and", "park and played soccer with", "with my friends."]
+    assert vu.stitch_transcripts(texts) == "I went to the park and played soccer with my friends."
+    assert vu.stitch_transcripts(["Hello there.", "General Kenobi"]) == "Hello there. General Kenobi"
+
+
+def test_long_recording_is_transcribed_in_order_and_faster():
+    n_words = 120
+    x = _synthetic_speech(n_words)
+    wav = vu.encode_wav(x, RATE)
+    duration = len(x) / RATE
+    assert duration > vu.STT_CHUNK_THRESHOLD_S
+
+    vm = _voice_manager()
+    started = time.perf_counter()
+    text = vm._whisper(wav)
+    elapsed = time.perf_counter() - started
+    single = duration * SECONDS_PER_AUDIO_S
+    calls = vm.openai_client.audio.transcriptions.calls
+    print(f"\n{duration:.0f}s audio: {calls} chunks in {elapsed:.2f}s (single request ≈ {single:.2f}s)")
+
+    assert calls > 1
+    assert re.findall(r"w\d+", text) == [f"w{i}" for i in range(n_words)]
+    # 조각을 동시에 전사하므로 한 번에 보내는 것보다 확실히 빨라야 함
+    assert elapsed < 0.7 * single
+
+
+def test_short_recording_is_sent_whole():
+    wav = vu.encode_wav(_synthetic_speech(10), RATE)
+    vm = _voice_manager()
+    assert vm._whisper(wav) == " ".join(f"w{i}" for i in range(10))
+    assert vm.openai_client.audio.transcriptions.calls == 1
@@ -0,0 +1,117 @@
+# Whisper 업로드 전처리: 합성 WAV로 디코드/다운믹스/16kHz 리샘플/무음 제거/용량 감소 확인
+import io
+import time
+import wave
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("streamlit")
+pytest.importorskip("openai")
+pytest.importorskip("dotenv")
+
+from app.utils import voice_utils as vu
+
+
+def _tone(hz: float, seconds: float, rate: int, amp: float = 0.5) -> np.ndarray:
+    t = np.arange(int(seconds * rate)) / rate
+    return (amp * np.sin(2 * np.pi * hz * t)).astype(np.float32)
+
+
+def _wav(x: np.ndarray, rate: int, width: int = 2) -> bytes:
+    """(frames, channels) float → PCM WAV (브라우저 녹음처럼 스테레오/고샘플레이트)."""
+    x = x.reshape(len(x), -1)
+    if width == 2:
+        raw = (np.clip(x, -1, 1) * 32767).astype("<i2").tobytes()
+    else:  # 24bit
+        v = (np.clip(x, -1, 1) * (2 ** 23 - 1)).astype("<i4").reshape(-1)
+        raw = np.stack([v & 0xFF, (v >> 8) & 0xFF, (v >> 16) & 0xFF], axis=1).astype(np.uint8).tobytes()
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(x.shape[1])
+        w.setsampwidth(width)
+        w.setframerate(rate)
+        w.writeframes(raw)
+    return buf.getvalue()
+
+
+def _browser_recording(rate: int = 48000) -> bytes:
+    """5초 48kHz 스테레오: 앞뒤 1초 무음 + 가운데 3초 말소리(두 톤)."""
+    silence = np.zeros(rate, dtype=np.float32)
+    voice = _tone(220, 3, rate, 0.3) + _tone(660, 3, rate, 0.2)
+    mono = np.concatenate([silence, voice, silence])
+    return _wav(np.stack([mono, 0.8 * mono], axis=1), rate)
+
+
+def _peak_hz(x: np.ndarray, rate: int) -> float:
+    return float(np.argmax(np.abs(np.fft.rfft(x))) * rate / len(x))
+
+
+@pytest.mark.parametrize("width", [2, 3])
+def test_decode_wav_reads_stereo_pcm(width):
+    left, right = _tone(440, 0.1, 8000), _tone(880, 0.1, 8000, 0.25)
+    x, rate = vu.decode_wav(_wav(np.stack([left, right], axis=1), 8000, width))
+    assert rate == 8000 and x.shape == (800, 2) and x.dtype == np.float32
+    assert np.allclose(x[:, 0], left, atol=1e-3)
+    assert np.allclose(x[:, 1], right, atol=1e-3)
+
+
+def test_downmix_averages_channels():
+    x = np.array([[1.0, 0.0], [0.5, 0.5], [-1.0, 1.0]], dtype=np.float32)
+    assert np.allclose(vu.downmix(x), [0.5, 0.5, 0.0])
+    assert np.array_equal(vu.downmix(x[:, 0]), x[:, 0])
+
+
+def test_resample_to_16k_keeps_speech_band_and_drops_aliasing():
+    rate = 48000
+    out = vu.resample(_tone(1000, 1, rate), rate, vu.STT_TARGET_RATE)
+    assert len(out) == vu.STT_TARGET_RATE
+    assert abs(_peak_hz(out, vu.STT_TARGET_RATE) - 1000) < 5
+    # 새 나이퀴스트(8kHz)보다 높은 톤은 저역통과로 거의 사라져야 함 (없으면 접혀서 6kHz 잡음)
+    high = vu.resample(_tone(10000, 1, rate), rate, vu.STT_TARGET_RATE)
+    assert np.sqrt(np.mean(high ** 2)) < 0.05 * np.sqrt(np.mean(_tone(10000, 1, rate) ** 2))
+
+
+def test_trim_silence_keeps_speech_with_padding():
+    rate = vu.STT_TARGET_RATE
+    x = np.concatenate([np.zeros(rate), _tone(300, 2, rate), np.zeros(rate)]).astype(np.float32)
+    trimmed = vu.trim_silence(x, rate)
+    pad = rate * vu.VAD_PAD_MS // 1000
+    frame = rate * vu.VAD_FRAME_MS // 1000
+    assert 2 * rate <= len(trimmed) <= 2 * rate + 2 * (pad + frame)
+    assert np.all(vu.trim_silence(np.zeros(rate, dtype=np.float32), rate) == 0)
+
+
+def test_preprocess_shrinks_browser_recording():
+    original = _browser_recording()
+    assert len(original) == 960044  # 5초 x 48kHz x 2ch x 16bit + 헤더
+
+    started = time.perf_counter()
+    upload = vu.preprocess_for_stt(original)
+    elapsed = time.perf_counter() - started
+    print(f"\npreprocess: {len(original):,} -> {len(upload):,} bytes "
+          f"({1 - len(upload) / len(original):.0%} smaller) in {elapsed * 1000:.0f} ms")
+
+    x, rate = vu.decode_wav(upload)
+    assert rate == vu.STT_TARGET_RATE and x.shape[1] == 1
+    # 앞뒤 무음이 잘려 3초 말소리 + 패딩만 남음
+    assert 3.0 <= len(x) / rate <= 3.0 + 2 * (vu.VAD_PAD_MS + vu.VAD_FRAME_MS) / 1000
+    assert len(upload) < len(original) / 8
+    assert abs(_peak_hz(x[:, 0], rate) - 220) < 5
+
+
+def test_preprocess_passes_through_non_wav():
+    data = b"\x1aE\xdf\xa3 webm bytes"
+    assert vu.preprocess_for_stt(data) is data
+
+
+def test_whisper_records_bytes_saved(monkeypatch):
+    monkeypatch.setattr(vu, "stt_metrics", vu.STTMetrics())
+    vm = vu.VoiceManager()
+    vm._whisper_request = lambda upload: "hello"
+    original = _browser_recording()
+    assert vm._whisper(original) == "hello"
+    summary = vu.stt_metrics.summary()
+    assert summary["requests"] == 1
+    assert summary["bytes_in"] == len(original) and summary["bytes_out"] == 109804
+    assert summary["bytes_saved_ratio"] > 0.85
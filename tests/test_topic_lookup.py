@@ -0,0 +1,54 @@
+# 질문 조회: 가짜 컬렉션으로 (category, topic_key) 정확 일치 조회와 인덱스 생성 확인
+import pytest
+
+pytest.importorskip("openai")
+
+MOVIES = ["What movies do you like?", "Tell me about the last movie you saw."]
+PURCHASE = ["Call the store and ask about the item."]
+
+
+@pytest.fixture
+def collection(fake_mongo):
+    col = fake_mongo.connect_db("opic_samples")
+    col.docs = [
+        {"category": "survey", "topic": "Movies", "topic_key": "movies", "content": MOVIES},
+        {"category": "survey", "topic": "Movies at home", "topic_key": "movies at home", "content": ["decoy"]},
+        {"category": "role_play", "topic": "Item Purchase", "topic_key": "item purchase", "content": PURCHASE},
+    ]
+    return col
+
+
+def test_ensure_indexes_builds_category_topic_key_once(fake_mongo, collection):
+    for _ in range(3):
+        assert fake_mongo.connect_db("opic_samples") is collection
+    assert collection.indexes == [{
+        "keys": [("category", fake_mongo.ASCENDING), ("topic_key", fake_mongo.ASCENDING)],
+        "name": "category_topic_key",
+        "unique": True,
+    }]
+
+
+def test_single_lookup_is_exact_match_on_topic_key(collection):
+    import quest
+
+    assert quest.get_questions_from_db("  MOVIES ") == MOVIES
+    assert collection.queries[-1] == {"category": "survey", "topic_key": "movies"}
+    assert quest.get_role_play_questions_from_db("item purchase") == PURCHASE
+    # 정규식/부분 일치가 아니므로 접두어나 다른 카테고리는 걸리지 않음
+    assert quest.get_questions_from_db("movie") == []
+    assert quest.get_random_questions_from_db("Movies") == []
+
+
+def test_bulk_lookup_uses_in_on_topic_key(collection):
+    import quest
+
+    pairs = [("survey", "Movies"), ("role_play", "ITEM PURCHASE"), ("survey", "movie")]
+    assert quest.get_questions_bulk_from_db(pairs) == {
+        ("survey", "Movies"): MOVIES,
+        ("role_play", "ITEM PURCHASE"): PURCHASE,
+    }
+    assert len(collection.queries) == 1
+    assert collection.queries[0] == {"$or": [
+        {"category": "survey", "topic_key": {"$in": ["movie", "movies"]}},
+        {"category": "role_play", "topic_key": {"$in": ["item purchase"]}},
+    ]}
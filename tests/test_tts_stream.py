@@ -0,0 +1,80 @@
+# 모범답안 스트리밍 TTS: 가짜 합성기로 첫 오디오까지의 시간 확인 (네트워크 불필요)
+import contextlib
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("streamlit")
+pytest.importorskip("openai")
+pytest.importorskip("dotenv")
+
+from app.utils import voice_utils as vu
+
+SECONDS_PER_WORD = 0.01  # 가짜 TTS 지연: 단어당 10ms
+
+SAMPLE = " ".join(
+    ["I usually go to the park on weekends."]
+    + [" ".join(["and then we walk around the lake for a while"] * 3) + "." for _ in range(4)]
+)
+
+
+def _fake_synthesize(self, text, voice=vu.TTS_VOICE):
+    time.sleep(len(text.split()) * SECONDS_PER_WORD)
+    return text.encode()
+
+
+class _Placeholder:
+    def container(self):
+        return contextlib.nullcontext()
+
+
+@pytest.fixture
+def fake_tts(monkeypatch):
+    monkeypatch.setattr(vu.VoiceManager, "synthesize", _fake_synthesize)
+    # 다른 사용자 요청으로 공용 조각 풀이 꽉 찬 상황
+    release = threading.Event()
+    for _ in range(vu.TTS_STREAM_WORKERS):
+        vu._tts_stream_executor.submit(release.wait, 5)
+    yield release
+    release.set()
+
+
+def test_first_segment_is_not_blocked_by_busy_pool(fake_tts):
+    segments = vu.split_tts_segments(SAMPLE)
+    assert len(segments) > 2 and len(segments[0].split()) < 10
+
+    started = time.perf_counter()
+    stream = vu.VoiceManager().stream_text_to_speech(SAMPLE)
+    first = next(stream)
+    first_s = time.perf_counter() - started
+    slowest = max(len(seg.split()) for seg in segments) * SECONDS_PER_WORD
+    print(f"\nfirst audio after {first_s * 1000:.0f} ms (slowest segment {slowest * 1000:.0f} ms)")
+
+    assert first == segments[0].encode()
+    assert first_s < slowest
+
+
+def test_player_is_drawn_as_soon_as_first_segment_arrives(fake_tts, monkeypatch):
+    fake_tts.set()  # 풀을 비워 나머지 조각도 동시에 합성되게 함
+    renders = []
+    started = time.perf_counter()
+    monkeypatch.setattr(vu.st, "empty", lambda: _Placeholder())
+    monkeypatch.setattr(vu.components, "html",
+                        lambda html, height=None: renders.append((time.perf_counter() - started, html)))
+
+    n = vu.play_audio_stream(iter([b"one", b"two", b"three"]))
+    assert n == 3
+    assert [html.count("data:audio/mpeg") for _, html in renders] == [1, 2, 3, 3]
+    assert ["const done = false" in html for _, html in renders] == [True, True, True, False]
+    # 모든 렌더가 같은 재생 상태 키를 공유해야 다시 그려도 이어서 재생
+    keys = {html.split("const key = ")[1].split(";")[0] for _, html in renders}
+    assert len(keys) == 1
+
+    renders.clear()
+    started = time.perf_counter()
+    vu.play_audio_stream(vu.VoiceManager().stream_text_to_speech(SAMPLE))
+    first_render, last_render = renders[0][0], renders[-1][0]
+    print(f"\nplayer drawn after {first_render * 1000:.0f} ms, complete after {last_render * 1000:.0f} ms")
+    assert first_render < 0.5 * last_render